@@ -1,23 +1,45 @@
 from contextlib import asynccontextmanager
+import anyio.to_thread
 import fastapi
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
+import logging
+import random
 import time
+import os
 
 # Import routers
+from src.config import config
 from src.api import outfits, color, try_on, auth, user_outfits, user_color, shape, user_info, beauty
 from src.database.user_db import init_db
-from src.utils.logger import get_logger
+from src.middleware.metrics import metrics_middleware
+from src.middleware.rate_limit import rate_limit_middleware
+from src.utils.logger import get_logger, stop_logging
+from src.utils.http_cache import cached_response, make_etag
+from src.utils.image_validator import shutdown_image_pool
+from src.utils.responses import ORJSONResponse, http_exception_handler
 
 logger = get_logger("app")
 
+# Routers included by create_app(), in registration order
+ROUTERS = (outfits, color, try_on, auth, user_outfits, user_color, shape, user_info, beauty)
+
 
 @asynccontextmanager
 async def lifespan(app: fastapi.FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
     logger.info("Starting Hack Seoul API...")
+
+    # Sync handlers and run_in_threadpool share AnyIO's limiter (40 by default).
+    # ANYIO_TOKENS sets the per-worker thread capacity.
+    anyio_tokens = int(os.getenv("ANYIO_TOKENS", "128"))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = anyio_tokens
+    logger.info(f"AnyIO threadpool capacity set to {anyio_tokens}")
+
     try:
         init_db()
         logger.info("Database initialized successfully")
@@ -25,94 +47,93 @@ async def lifespan(app: fastapi.FastAPI):
         logger.error(f"Failed to initialize database: {str(e)}", exc_info=True)
         raise
     
+    # Preload the static brand export so its endpoint never touches the disk
+    try:
+        outfits.load_brand_data()
+    except Exception as e:
+        logger.warning(f"Failed to preload brand outfit data: {str(e)}")
+    
     logger.info("API startup complete")
     yield
     
     # Shutdown
     logger.info("Shutting down Hack Seoul API...")
+    shutdown_image_pool()
+    await config.aclose()
+    stop_logging()
 
 
-app = fastapi.FastAPI(
-    title="Hack Seoul Fashion API",
-    description="Personal color analysis and outfit try-on API",
-    version="1.0.0",
-    lifespan=lifespan
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # TODO: Restrict to specific origins in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Rate limiting middleware (must be before logging middleware)
-from src.middleware.rate_limit import rate_limit_middleware
-app.middleware("http")(rate_limit_middleware)
+# Request logging middleware
+# Health checks and metric scrapes are never logged
+FAST_PATHS = frozenset({"/", "/health", "/metrics"})
+# Fraction of fast, successful requests that get logged (errors and slow requests always are)
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+SLOW_REQUEST_THRESHOLD = 0.5  # seconds
 
-# Metrics middleware (tracks response time and success rate)
-from src.middleware.metrics import metrics_middleware
-app.middleware("http")(metrics_middleware)
 
-# Request logging middleware
-@app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all HTTP requests and responses."""
-    start_time = time.time()
+    """Log failed, slow and a sample of successful HTTP requests."""
+    if request.url.path in FAST_PATHS:
+        return await call_next(request)
     
-    # Log request
-    logger.info(
-        f"Request: {request.method} {request.url.path} - "
-        f"Client: {request.client.host if request.client else 'unknown'}"
-    )
+    start_ns = time.perf_counter_ns()
     
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
+        process_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Time: {process_time:.3f}s"
-        )
+        if logger.isEnabledFor(logging.INFO) and (
+            response.status_code >= 400
+            or process_time > SLOW_REQUEST_THRESHOLD
+            or random.random() < REQUEST_LOG_SAMPLE_RATE
+        ):
+            logger.info(
+                "Response: %s %s - Client: %s - Status: %s - Time: %.3fs",
+                request.method,
+                request.url.path,
+                request.client.host if request.client else "unknown",
+                response.status_code,
+                process_time
+            )
         
         return response
     except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Error processing request: {request.method} {request.url.path} - "
-            f"Error: {str(e)} - Time: {process_time:.3f}s",
-            exc_info=True
-        )
+        process_time = (time.perf_counter_ns() - start_ns) / 1e9
+        # Expected client errors don't need a traceback
+        if isinstance(e, (fastapi.HTTPException, RequestValidationError)):
+            logger.warning(
+                "Request failed: %s %s - Error: %s - Time: %.3fs",
+                request.method,
+                request.url.path,
+                e,
+                process_time
+            )
+        else:
+            logger.error(
+                "Error processing request: %s %s - Error: %s - Time: %.3fs",
+                request.method,
+                request.url.path,
+                e,
+                process_time,
+                exc_info=True
+            )
         raise
 
-# Include routers
-app.include_router(outfits.router)
-app.include_router(color.router)
-app.include_router(try_on.router)
-app.include_router(auth.router)
-app.include_router(user_outfits.router)
-app.include_router(user_color.router)
-app.include_router(shape.router)
-app.include_router(user_info.router)
-app.include_router(beauty.router)
+# The health check body never changes, so it is serialized and tagged once
+ROOT_BODY = ORJSONResponse({"message": "Let's win Hack Seoul! I need more money, please im broke!"}).body
+ROOT_ETAG = make_etag(ROOT_BODY)
 
 
-@app.get("/")
-def read_root():
+async def read_root(request: Request):
     """
     Root endpoint - API health check.
     """
     logger.debug("Health check endpoint accessed")
-    return {"message": "Let's win Hack Seoul! I need more money, please im broke!"}
+    return cached_response(request, ROOT_BODY, ROOT_ETAG)
 
 
-@app.get("/metrics")
-def get_metrics(endpoint: str | None = None):
+async def get_metrics(endpoint: str | None = None):
     """
     Get API metrics (response time and success rate).
     
@@ -132,5 +153,62 @@ def get_metrics(endpoint: str | None = None):
     return metrics_collector.get_metrics(endpoint)
 
 
+def create_app() -> fastapi.FastAPI:
+    """
+    Build the FastAPI application with middleware and routers registered.
+    
+    Returns:
+        Configured FastAPI instance
+    """
+    app = fastapi.FastAPI(
+        title="Hack Seoul Fashion API",
+        description="Personal color analysis and outfit try-on API",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
+    )
+    # Error bodies (400/401/404/...) are rendered with orjson too
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # TODO: Restrict to specific origins in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # Middleware added later wraps earlier ones: logging -> metrics -> rate limit
+    app.middleware("http")(rate_limit_middleware)
+    app.middleware("http")(metrics_middleware)
+    app.middleware("http")(log_requests)
+    
+    for module in ROUTERS:
+        app.include_router(module.router)
+    
+    app.get("/")(read_root)
+    app.get("/metrics")(get_metrics)
+    
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need an import string instead of the app object;
+    # with factory=True each worker builds its own app via create_app().
+    # uvloop/httptools replace the default asyncio loop and h11 parser.
+    uvicorn.run(
+        "app:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("UVICORN_WORKERS", "4")),
+        loop="uvloop",
+        http="httptools",
+        log_level=os.getenv("UVICORN_LOG_LEVEL", "warning"),
+        # Caps in-flight requests per worker; excess connections get a 503
+        limit_concurrency=int(os.getenv("UVICORN_LIMIT_CONCURRENCY", "0")) or None,
+    )
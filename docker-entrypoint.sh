@@ -12,6 +12,10 @@ mkdir -p /app/logs
 echo "Initializing database..."
 uv run python -c "from src.database.user_db import init_db; init_db()" || echo "Warning: Database initialization failed, continuing anyway..."
 
+# Bring existing tables up to the current indexes (idempotent)
+echo "Migrating color results indexes..."
+uv run python migrate_color_results.py || echo "Warning: Color results migration failed, continuing anyway..."
+
 # Check if products need to be migrated
 if [ ! -f /app/data/.products_migrated ]; then
     echo "Checking if products need to be migrated..."
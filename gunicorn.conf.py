@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for production.
+
+The app is imported once in the master (preload) and workers are forked from
+it, so module-level state (Gemini/OpenAI/Anthropic clients, prompts, loaded
+data) is shared copy-on-write instead of rebuilt per worker.
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+import os
+
+from uvicorn_worker import UvicornWorker
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("UVICORN_WORKERS", "4"))
+preload_app = True
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker with uvloop/httptools and an optional concurrency cap."""
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "limit_concurrency": int(os.getenv("UVICORN_LIMIT_CONCURRENCY", "0")) or None,
+    }
+
+
+worker_class = Worker
+
+
+def post_fork(server, worker):
+    """Drop DB connections inherited from the master; each worker opens its own."""
+    from src.database.user_db import engine
+    engine.dispose(close=False)
@@ -0,0 +1,70 @@
+"""
+Color results index migration script.
+Brings an existing user_color_results table up to the current schema.
+
+create_all() in init_db() skips tables that already exist, so databases
+created before created_at became NOT NULL and before the composite index
+need this run once. It issues DDL, so run it before starting the server
+rather than from every worker.
+"""
+from datetime import datetime
+from sqlalchemy import text, update
+from src.database.user_db import engine, init_db, UserColorResult
+from src.utils.logger import get_logger
+
+logger = get_logger("migrate_color_results")
+
+
+# Single-column indexes covered by ix_user_color_results_user_created_id
+SUPERSEDED_INDEXES = ("ix_user_color_results_user_id",)
+
+# Stands in for a missing created_at, so those results stay oldest
+BACKFILL_CREATED_AT = datetime(1970, 1, 1)
+
+
+def migrate_color_results() -> None:
+    """Backfill created_at, then create the current indexes and drop superseded ones."""
+    # Initialize database
+    init_db()
+
+    try:
+        with engine.begin() as connection:
+            backfilled = connection.execute(
+                update(UserColorResult)
+                .where(UserColorResult.created_at.is_(None))
+                .values(created_at=BACKFILL_CREATED_AT)
+            ).rowcount
+            logger.info(f"Backfilled created_at on {backfilled} color results")
+            # SQLite cannot alter a column constraint; new tables get it from the model
+            if engine.dialect.name == "postgresql":
+                connection.execute(text("ALTER TABLE user_color_results ALTER COLUMN created_at SET NOT NULL"))
+
+        for index in UserColorResult.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+            logger.info(f"Ensured index {index.name}")
+
+        with engine.begin() as connection:
+            for name in SUPERSEDED_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                logger.info(f"Dropped index {name} if present")
+
+        logger.info("Color results migration completed")
+    except Exception as e:
+        logger.error(f"Color results migration failed: {str(e)}", exc_info=True)
+        raise
+
+
+def main():
+    """Main entry point for migration."""
+    import sys
+
+    try:
+        migrate_color_results()
+        print("✓ Color results migrated")
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,104 @@ Loads product data from CSV file into the database.
 """
 import csv
 from pathlib import Path
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from src.database.db import clear_outfit_cache
 from src.database.user_db import SessionLocal, Product, init_db
 from src.utils.logger import get_logger
 
 logger = get_logger("migrate_products")
 
 
+# Rows written per bulk INSERT/UPDATE round trip
+BATCH_SIZE = 1000
+
+# CSV column -> Product attribute
+CSV_FIELDS = {
+    'description': 'description',
+    'price': 'price',
+    'imageUrl': 'image_url',
+    'colorHex': 'color_hex',
+    'productUrl': 'product_url',
+    'colorName': 'color_name',
+    'detailDescription': 'detail_description',
+    'type': 'type',
+    'personalColorType': 'personal_color_type',
+}
+
+
+def _build_column_index(header: list[str]) -> tuple[int | None, list[tuple[str, int]]]:
+    """
+    Resolve CSV header positions once so rows can be read by index.
+    
+    Returns:
+        Tuple of (id column index, [(Product attribute, column index), ...])
+    """
+    idx = {name: i for i, name in enumerate(header)}
+    columns = [(attr, idx[csv_field]) for csv_field, attr in CSV_FIELDS.items() if csv_field in idx]
+    return idx.get('id'), columns
+
+
+def _row_to_mapping(row: list[str], id_index: int | None, columns: list[tuple[str, int]]) -> dict:
+    """Convert a CSV row into a Product column mapping."""
+    mapping = {'external_id': int(row[id_index]) if id_index is not None else 0}
+    for attr in CSV_FIELDS.values():
+        mapping[attr] = None
+    for attr, i in columns:
+        if i < len(row):
+            mapping[attr] = row[i].strip() or None
+    return mapping
+
+
+def _write_batches(db: Session, write, rows: list[dict], label: str) -> tuple[int, int]:
+    """
+    Write product mappings in BATCH_SIZE bulk round trips, one commit each.
+    
+    A batch that fails is rolled back and retried row by row, so only the
+    bad rows are skipped.
+    
+    Args:
+        db: Database session
+        write: db.bulk_insert_mappings or db.bulk_update_mappings
+        rows: Product column mappings
+        label: Verb for progress logs ("Migrated", "Updated")
+        
+    Returns:
+        Tuple of (written_count, failed_count)
+    """
+    written = 0
+    failed = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        try:
+            write(Product, batch)
+            db.commit()
+            written += len(batch)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Batch of {len(batch)} products failed, retrying row by row: {str(e)}")
+            for mapping in batch:
+                try:
+                    write(Product, [mapping])
+                    db.commit()
+                    written += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error processing row {mapping['external_id']}: {str(e)}", exc_info=True)
+                    failed += 1
+        logger.info(f"{label} {written} products so far...")
+    return written, failed
+
+
 def migrate_products_from_csv(csv_path: Path, update_existing: bool = False, clear_first: bool = False) -> tuple[int, int, int]:
     """
     Migrate products from CSV file to database.
     
+    Existing IDs are loaded once up front and rows are written with bulk
+    INSERT/UPDATE batches instead of one query and one ORM add per row.
+    When an ID repeats in the CSV its last row wins; rows that fail to
+    write are logged and counted as skipped.
+    
     Args:
         csv_path: Path to the CSV file
         update_existing: If True, update existing products instead of skipping
@@ -43,71 +130,47 @@ def migrate_products_from_csv(csv_path: Path, update_existing: bool = False, cle
             db.commit()
             logger.info(f"Cleared {deleted} existing products")
         
+        # external_id -> primary key, used for existence checks and bulk updates
+        existing_ids = dict(db.execute(select(Product.external_id, Product.id)).all())
+        # external_id -> mapping; a repeated ID overwrites, so its last row wins
+        rows: dict[int, dict] = {}
+        
         logger.info(f"Reading products from CSV: {csv_path}")
         
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            id_index, columns = _build_column_index(next(reader, []))
             
             for row in reader:
                 try:
-                    # Extract data from CSV row
-                    external_id = int(row.get('id', 0))
-                    
-                    # Check if product already exists
-                    existing = db.query(Product).filter(
-                        Product.external_id == external_id
-                    ).first()
-                    
-                    if existing:
-                        if update_existing:
-                            # Update existing product
-                            existing.description = row.get('description', '').strip() or None
-                            existing.price = row.get('price', '').strip() or None
-                            existing.image_url = row.get('imageUrl', '').strip() or None
-                            existing.color_hex = row.get('colorHex', '').strip() or None
-                            existing.product_url = row.get('productUrl', '').strip() or None
-                            existing.color_name = row.get('colorName', '').strip() or None
-                            existing.detail_description = row.get('detailDescription', '').strip() or None
-                            existing.type = row.get('type', '').strip() or None
-                            existing.personal_color_type = row.get('personalColorType', '').strip() or None
-                            updated_count += 1
-                            
-                            if updated_count % 50 == 0:
-                                db.commit()
-                                logger.info(f"Updated {updated_count} products so far...")
-                        else:
-                            logger.debug(f"Product with ID {external_id} already exists, skipping")
-                            skipped_count += 1
-                        continue
-                    
-                    # Create new product
-                    product = Product(
-                        external_id=external_id,
-                        description=row.get('description', '').strip() or None,
-                        price=row.get('price', '').strip() or None,
-                        image_url=row.get('imageUrl', '').strip() or None,
-                        color_hex=row.get('colorHex', '').strip() or None,
-                        product_url=row.get('productUrl', '').strip() or None,
-                        color_name=row.get('colorName', '').strip() or None,
-                        detail_description=row.get('detailDescription', '').strip() or None,
-                        type=row.get('type', '').strip() or None,
-                        personal_color_type=row.get('personalColorType', '').strip() or None,
-                    )
-                    
-                    db.add(product)
-                    migrated_count += 1
-                    
-                    if migrated_count % 50 == 0:
-                        db.commit()
-                        logger.info(f"Migrated {migrated_count} products so far...")
-                        
+                    mapping = _row_to_mapping(row, id_index, columns)
                 except Exception as e:
-                    logger.error(f"Error processing row {row.get('id', 'unknown')}: {str(e)}", exc_info=True)
-                    db.rollback()
+                    row_id = row[id_index] if id_index is not None and id_index < len(row) else 'unknown'
+                    logger.error(f"Error processing row {row_id}: {str(e)}", exc_info=True)
                     continue
+                
+                if mapping['external_id'] in rows:
+                    logger.debug(f"Product with ID {mapping['external_id']} repeated in CSV, using the later row")
+                    skipped_count += 1
+                rows[mapping['external_id']] = mapping
+        
+        new_rows: list[dict] = []
+        update_rows: list[dict] = []
+        for external_id, mapping in rows.items():
+            if external_id not in existing_ids:
+                new_rows.append(mapping)
+            elif update_existing:
+                mapping['id'] = existing_ids[external_id]
+                update_rows.append(mapping)
+            else:
+                logger.debug(f"Product with ID {external_id} already exists, skipping")
+                skipped_count += 1
         
-        # Final commit
-        db.commit()
+        migrated_count, failed = _write_batches(db, db.bulk_insert_mappings, new_rows, "Migrated")
+        skipped_count += failed
+        updated_count, failed = _write_batches(db, db.bulk_update_mappings, update_rows, "Updated")
+        skipped_count += failed
+        clear_outfit_cache()
         logger.info(f"Migration completed: {migrated_count} products migrated, {updated_count} updated, {skipped_count} skipped")
         
     except Exception as e:
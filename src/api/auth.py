@@ -2,13 +2,16 @@
 Authentication API endpoints for user registration and login.
 """
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from src.database.user_db import get_db, User
 from src.utils.auth import (
     get_password_hash,
     authenticate_user,
     create_access_token,
-    get_current_user
+    get_current_user,
+    CurrentUser
 )
 from src.models import (
     UserRegisterRequest,
@@ -22,8 +25,25 @@ logger = get_logger("api.auth")
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
+def _email_exists(db: Session, email: str) -> bool:
+    """Check whether a user with this email is already registered (index-only SELECT 1)."""
+    return db.execute(select(1).where(User.email == email).limit(1)).scalar() is not None
+
+
+def _create_user(db: Session, email: str, password_hash: str) -> User:
+    """Insert a new user and return it with generated fields loaded."""
+    new_user = User(
+        email=email,
+        password_hash=password_hash
+    )
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
+async def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
     """
     Register a new user.
     
@@ -34,30 +54,26 @@ def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
     Returns:
         Access token and user information
     """
-    logger.info(f"Registration attempt for email: {request.email}")
+    logger.info("Registration attempt for email: %s", request.email)
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
-    if existing_user:
-        logger.warning(f"Registration failed: Email already registered - {request.email}")
+    if await run_in_threadpool(_email_exists, db, request.email):
+        logger.warning("Registration failed: Email already registered - %s", request.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     try:
-        # Create new user
-        hashed_password = get_password_hash(request.password)
-        new_user = User(
-            email=request.email,
-            password_hash=hashed_password
-        )
+        # Create new user (bcrypt and DB calls block, so keep them off the event loop)
+        hashed_password = await run_in_threadpool(get_password_hash, request.password)
+        new_user = await run_in_threadpool(_create_user, db, request.email, hashed_password)
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        
-        logger.info(f"User registered successfully: user_id={new_user.id}, email={new_user.email}")
+        logger.info(
+            "User registered successfully: user_id=%s, email=%s",
+            new_user.id, new_user.email,
+            extra={"user_id": new_user.id}
+        )
         
         # Create access token
         access_token = create_access_token(data={"sub": new_user.id})
@@ -69,8 +85,8 @@ def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
             email=new_user.email
         )
     except Exception as e:
-        logger.error(f"Registration error for email {request.email}: {str(e)}", exc_info=True)
-        db.rollback()
+        logger.error("Registration error for email %s: %s", request.email, e, exc_info=True)
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to register user"
@@ -78,7 +94,7 @@ def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: UserLoginRequest, db: Session = Depends(get_db)):
+async def login(request: UserLoginRequest, db: Session = Depends(get_db)):
     """
     Login with email and password.
     
@@ -89,11 +105,11 @@ def login(request: UserLoginRequest, db: Session = Depends(get_db)):
     Returns:
         Access token and user information
     """
-    logger.info(f"Login attempt for email: {request.email}")
+    logger.info("Login attempt for email: %s", request.email)
     
-    user = authenticate_user(db, request.email, request.password)
+    user = await run_in_threadpool(authenticate_user, db, request.email, request.password)
     if not user:
-        logger.warning(f"Login failed: Invalid credentials for email {request.email}")
+        logger.warning("Login failed: Invalid credentials for email %s", request.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -102,7 +118,7 @@ def login(request: UserLoginRequest, db: Session = Depends(get_db)):
     
     # Create access token
     access_token = create_access_token(data={"sub": user.id})
-    logger.info(f"Login successful: user_id={user.id}, email={user.email}")
+    logger.info("Login successful: user_id=%s, email=%s", user.id, user.email, extra={"user_id": user.id})
     
     return TokenResponse(
         access_token=access_token,
@@ -113,7 +129,7 @@ def login(request: UserLoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: CurrentUser = Depends(get_current_user)):
     """
     Get current authenticated user information.
     
@@ -123,7 +139,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     Returns:
         User information
     """
-    logger.info(f"Get current user info request: user_id={current_user.id}, email={current_user.email}")
+    logger.info("Get current user info request: user_id=%s, email=%s", current_user.id, current_user.email)
     
     return UserResponse(
         id=current_user.id,
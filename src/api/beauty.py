@@ -2,10 +2,16 @@
 Beauty-related API endpoints (makeup and hair recommendations).
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Callable
+import asyncio
+import logging
 import time
-import json
+import httpx
+import orjson
 from PIL import Image
-from google.genai import types
+from google.genai import errors as genai_errors, types
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 from src.config import config
 from src.models import (
@@ -14,48 +20,83 @@ from src.models import (
     HairRecommendationRequest,
     HairRecommendationResponse
 )
-from src.services.stylist import get_your_color_season
+from src.services.stylist import aget_your_color_season
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 from src.utils.logger import get_logger
 from src.utils.image_validator import (
     validate_image_from_base64,
     ImageValidationError
 )
 from src.utils.image_utils import base64_to_image
+from src.utils.llm_json import parse_llm_json
 
 logger = get_logger("api.beauty")
 router = APIRouter(prefix="/api/beauty", tags=["beauty"])
 
 client = config.get_client()
 
+# Same vocabulary as the color analysis prompt, so speculative answers can match it
+SPECULATIVE_COLOR_TYPE_FIELD = (
+    "MUST be one of: 'Bright Spring', 'Deep Autumn', 'Deep Winter', 'Light Spring', "
+    "'Light Summer', 'Soft Autumn', 'Soft Summer', 'True Autumn', 'True Winter'"
+)
 
-def get_makeup_recommendations(
-    face_image_input: str | Image.Image,
-    personal_color_type: str | None = None
-) -> dict:
-    """
-    Get makeup recommendations based on face image and personal color type.
-    
-    Args:
-        face_image_input: Either a base64 string/data URL or a PIL Image object
-        personal_color_type: Optional personal color type (if not provided, will be analyzed)
-    
-    Returns:
-        Dictionary with makeup recommendations
-    """
-    if isinstance(face_image_input, str):
-        image = base64_to_image(face_image_input)
-    else:
-        image = face_image_input
-    
-    # Analyze personal color if not provided
-    if not personal_color_type:
-        color_result = get_your_color_season(image)
-        personal_color_type = color_result.personal_color_type
-    else:
-        color_result = None
-    
-    # Create prompt for makeup recommendations
-    makeup_prompt = f"""Analyze this face image and provide makeup recommendations based on the person's personal color type: {personal_color_type}.
+
+# Recommendation calls give up well before the client-wide LLM timeout
+GEMINI_JSON_TIMEOUT_MS = 30_000
+
+_STRING = types.Schema(type=types.Type.STRING)
+_STRING_LIST = types.Schema(type=types.Type.ARRAY, items=_STRING)
+
+# Structured output schemas; personal_color_type is only filled in by speculative prompts
+MAKEUP_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "personal_color_type": _STRING,
+        "lipstick_colors": _STRING_LIST,
+        "eyeshadow_colors": _STRING_LIST,
+        "blush_colors": _STRING_LIST,
+        "foundation_tone": _STRING,
+        "recommendations": _STRING,
+    },
+    required=["lipstick_colors", "eyeshadow_colors", "blush_colors", "foundation_tone", "recommendations"],
+)
+HAIR_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "personal_color_type": _STRING,
+        "recommended_colors": _STRING_LIST,
+        "recommended_styles": _STRING_LIST,
+        "recommendations": _STRING,
+    },
+    required=["recommended_colors", "recommended_styles", "recommendations"],
+)
+
+# Built once at import instead of per request
+MAKEUP_GENERATE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=MAKEUP_SCHEMA,
+    http_options=types.HttpOptions(timeout=GEMINI_JSON_TIMEOUT_MS),
+)
+HAIR_GENERATE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=HAIR_SCHEMA,
+    http_options=types.HttpOptions(timeout=GEMINI_JSON_TIMEOUT_MS),
+)
+
+# Upstream failures worth retrying once and counting toward the circuit breaker
+GEMINI_TRANSIENT_ERRORS = (TimeoutError, httpx.TransportError, genai_errors.ServerError)
+
+# Fail fast with 503 while Gemini is down instead of queueing requests behind timeouts
+gemini_breaker = CircuitBreaker("gemini", fail_max=5, reset_timeout=30)
+
+_SPECULATIVE_COLOR_CONTEXT = "based on the person's personal color type, which you should determine from the image"
+_SPECULATIVE_COLOR_FIELD = f'\n    "personal_color_type": "{SPECULATIVE_COLOR_TYPE_FIELD}",'
+
+# Static prompt parts are built once at import; per request only the color
+# type (and hair color) are joined in.
+_MAKEUP_PROMPT_HEAD = "Analyze this face image and provide makeup recommendations "
+_MAKEUP_PROMPT_BODY = """.
 
 Consider:
 1. Lipstick colors that complement the personal color type (provide HEX codes)
@@ -64,35 +105,194 @@ Consider:
 4. Foundation tone recommendations
 
 Return ONLY a valid JSON object with this exact structure:
-{{
+{"""
+_MAKEUP_PROMPT_FIELDS = """
     "lipstick_colors": ["#HEX1", "#HEX2", "#HEX3"],
     "eyeshadow_colors": ["#HEX1", "#HEX2", "#HEX3"],
     "blush_colors": ["#HEX1", "#HEX2"],
     "foundation_tone": "description of recommended foundation tone",
     "recommendations": "detailed makeup recommendations and tips"
-}}"""
-    
-    response = client.models.generate_content(
+}"""
+_MAKEUP_PROMPT_KNOWN_HEAD = _MAKEUP_PROMPT_HEAD + "based on the person's personal color type: "
+_MAKEUP_PROMPT_KNOWN_TAIL = _MAKEUP_PROMPT_BODY + _MAKEUP_PROMPT_FIELDS
+_MAKEUP_PROMPT_SPECULATIVE = (
+    _MAKEUP_PROMPT_HEAD + _SPECULATIVE_COLOR_CONTEXT
+    + _MAKEUP_PROMPT_BODY + _SPECULATIVE_COLOR_FIELD + _MAKEUP_PROMPT_FIELDS
+)
+
+_HAIR_PROMPT_HEAD = "Analyze this face image and provide hair color and style recommendations "
+_HAIR_PROMPT_BODY = """
+
+Consider:
+1. Hair colors that complement the personal color type (provide HEX codes for recommended colors)
+2. Hair styles that suit the face shape and personal color type
+3. Overall recommendations for hair care and styling
+
+Return ONLY a valid JSON object with this exact structure:
+{"""
+_HAIR_PROMPT_FIELDS = """
+    "recommended_colors": ["#HEX1", "#HEX2", "#HEX3"],
+    "recommended_styles": ["style1", "style2", "style3"],
+    "recommendations": "detailed hair recommendations and tips"
+}"""
+_HAIR_PROMPT_KNOWN_HEAD = _HAIR_PROMPT_HEAD + "based on the person's personal color type: "
+_HAIR_PROMPT_SPECULATIVE_HEAD = _HAIR_PROMPT_HEAD + _SPECULATIVE_COLOR_CONTEXT
+_HAIR_PROMPT_KNOWN_TAIL = _HAIR_PROMPT_BODY + _HAIR_PROMPT_FIELDS
+_HAIR_PROMPT_SPECULATIVE_TAIL = _HAIR_PROMPT_BODY + _SPECULATIVE_COLOR_FIELD + _HAIR_PROMPT_FIELDS
+
+
+def _makeup_prompt(personal_color_type: str | None) -> str:
+    """
+    Build the makeup prompt. Without a known personal color type the model is
+    asked to determine it and echo it back in the JSON.
+    """
+    if not personal_color_type:
+        return _MAKEUP_PROMPT_SPECULATIVE
+    return "".join((_MAKEUP_PROMPT_KNOWN_HEAD, personal_color_type, _MAKEUP_PROMPT_KNOWN_TAIL))
+
+
+def _hair_prompt(personal_color_type: str | None, current_hair_color: str | None = None) -> str:
+    """
+    Build the hair prompt. Without a known personal color type the model is
+    asked to determine it and echo it back in the JSON.
+    """
+    hair_color = current_hair_color or "not specified"
+    if not personal_color_type:
+        return "".join((
+            _HAIR_PROMPT_SPECULATIVE_HEAD, ". Current hair color: ", hair_color, _HAIR_PROMPT_SPECULATIVE_TAIL
+        ))
+    return "".join((
+        _HAIR_PROMPT_KNOWN_HEAD, personal_color_type, ". Current hair color: ", hair_color, _HAIR_PROMPT_KNOWN_TAIL
+    ))
+
+
+@retry(
+    wait=wait_exponential_jitter(initial=0.2, max=2.0),
+    stop=stop_after_attempt(2),
+    retry=retry_if_exception_type(GEMINI_TRANSIENT_ERRORS),
+    reraise=True
+)
+async def _stream_gemini_text(
+    image: Image.Image,
+    prompt: str,
+    generate_config: types.GenerateContentConfig
+) -> bytearray:
+    """Stream image + prompt through Gemini's async client, accumulating the reply bytes."""
+    buffer = bytearray()
+    async for chunk in await client.aio.models.generate_content_stream(
         model="gemini-2.5-flash",
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-        ),
-        contents=[image, makeup_prompt],
+        config=generate_config,
+        contents=[image, prompt],
+    ):
+        if chunk.text:
+            buffer += chunk.text.encode("utf-8")
+    return buffer
+
+
+async def _call_gemini_json(
+    image: Image.Image,
+    prompt: str,
+    generate_config: types.GenerateContentConfig
+) -> dict:
+    """
+    Run image + prompt through Gemini and parse the JSON reply.
+    
+    generate_config carries the response schema, so the reply is plain JSON;
+    parse_llm_json still tolerates stray fences.
+    
+    Transient upstream errors are retried once with jittered backoff; repeated
+    failures open gemini_breaker, after which calls raise CircuitOpenError.
+    """
+    gemini_breaker.before_call()
+    try:
+        buffer = await _stream_gemini_text(image, prompt, generate_config)
+    except GEMINI_TRANSIENT_ERRORS:
+        gemini_breaker.record_failure()
+        raise
+    except BaseException:
+        # Client errors (400, 429) and cancellation are no verdict on Gemini's
+        # health, but must not leave a half-open trial in flight forever
+        gemini_breaker.release_trial()
+        raise
+    gemini_breaker.record_success()
+    
+    try:
+        return parse_llm_json(buffer)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"JSON decode error: {e}. Response text: {buffer[:200].decode('utf-8', 'replace')}")
+
+
+async def _load_face_image(face_image_input: str | Image.Image) -> Image.Image:
+    """Decode a base64/data URL input off the event loop; PIL images pass through."""
+    if isinstance(face_image_input, str):
+        return await run_in_threadpool(base64_to_image, face_image_input)
+    return face_image_input
+
+
+async def _generate_recommendations(
+    image: Image.Image,
+    personal_color_type: str | None,
+    build_prompt: Callable[[str | None], str],
+    generate_config: types.GenerateContentConfig
+) -> tuple[str, dict]:
+    """
+    Run the recommendation prompt, analyzing personal color first if needed.
+    
+    When personal_color_type is unknown, color analysis and a speculative
+    recommendation call (where the model infers the color type itself) run
+    concurrently. The speculative result is kept if its color type agrees with
+    the color analysis; otherwise the prompt is re-run with the analyzed type.
+    
+    Returns:
+        Tuple of (personal_color_type, parsed recommendation JSON)
+    """
+    if personal_color_type:
+        return personal_color_type, await _call_gemini_json(image, build_prompt(personal_color_type), generate_config)
+    
+    color_result, speculative = await asyncio.gather(
+        aget_your_color_season(image),
+        _call_gemini_json(image, build_prompt(None), generate_config),
+        return_exceptions=True
+    )
+    if isinstance(color_result, BaseException):
+        raise color_result
+    
+    personal_color_type = color_result.personal_color_type
+    if (
+        isinstance(speculative, dict)
+        and str(speculative.get("personal_color_type", "")).strip().lower() == personal_color_type.lower()
+    ):
+        logger.debug("Speculative recommendations matched personal_color_type=%s", personal_color_type)
+        return personal_color_type, speculative
+    
+    logger.debug("Speculative recommendations discarded, re-running for personal_color_type=%s", personal_color_type)
+    return personal_color_type, await _call_gemini_json(image, build_prompt(personal_color_type), generate_config)
+
+
+async def get_makeup_recommendations(
+    face_image_input: str | Image.Image,
+    personal_color_type: str | None = None
+) -> dict:
+    """
+    Get makeup recommendations based on face image and personal color type.
+    
+    Args:
+        face_image_input: Either a base64 string/data URL or a PIL Image object
+        personal_color_type: Optional personal color type (if not provided, will be analyzed)
+    
+    Returns:
+        Dictionary with makeup recommendations
+    """
+    image = await _load_face_image(face_image_input)
+    personal_color_type, data = await _generate_recommendations(
+        image,
+        personal_color_type,
+        _makeup_prompt,
+        MAKEUP_GENERATE_CONFIG
     )
     
     try:
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        data = json.loads(response_text)
-        
-        result = {
+        return {
             "personal_color_type": personal_color_type,
             "lipstick_colors": data.get("lipstick_colors", []),
             "eyeshadow_colors": data.get("eyeshadow_colors", []),
@@ -100,15 +300,11 @@ Return ONLY a valid JSON object with this exact structure:
             "foundation_tone": data.get("foundation_tone", "Natural"),
             "recommendations": data.get("recommendations", "No recommendations provided")
         }
-        
-        return result
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON decode error: {e}. Response text: {response_text[:200]}")
     except Exception as e:
         raise ValueError(f"Error parsing makeup recommendations: {e}")
 
 
-def get_hair_recommendations(
+async def get_hair_recommendations(
     face_image_input: str | Image.Image,
     personal_color_type: str | None = None,
     current_hair_color: str | None = None
@@ -124,71 +320,27 @@ def get_hair_recommendations(
     Returns:
         Dictionary with hair recommendations
     """
-    if isinstance(face_image_input, str):
-        image = base64_to_image(face_image_input)
-    else:
-        image = face_image_input
-    
-    # Analyze personal color if not provided
-    if not personal_color_type:
-        color_result = get_your_color_season(image)
-        personal_color_type = color_result.personal_color_type
-    else:
-        color_result = None
-    
-    # Create prompt for hair recommendations
-    hair_info = f"Current hair color: {current_hair_color}" if current_hair_color else "Current hair color: not specified"
-    
-    hair_prompt = f"""Analyze this face image and provide hair color and style recommendations based on the person's personal color type: {personal_color_type}. {hair_info}
-
-Consider:
-1. Hair colors that complement the personal color type (provide HEX codes for recommended colors)
-2. Hair styles that suit the face shape and personal color type
-3. Overall recommendations for hair care and styling
-
-Return ONLY a valid JSON object with this exact structure:
-{{
-    "recommended_colors": ["#HEX1", "#HEX2", "#HEX3"],
-    "recommended_styles": ["style1", "style2", "style3"],
-    "recommendations": "detailed hair recommendations and tips"
-}}"""
-    
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-        ),
-        contents=[image, hair_prompt],
+    image = await _load_face_image(face_image_input)
+    personal_color_type, data = await _generate_recommendations(
+        image,
+        personal_color_type,
+        lambda color_type: _hair_prompt(color_type, current_hair_color),
+        HAIR_GENERATE_CONFIG
     )
     
     try:
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        data = json.loads(response_text)
-        
-        result = {
+        return {
             "personal_color_type": personal_color_type,
             "recommended_colors": data.get("recommended_colors", []),
             "recommended_styles": data.get("recommended_styles", []),
             "recommendations": data.get("recommendations", "No recommendations provided")
         }
-        
-        return result
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON decode error: {e}. Response text: {response_text[:200]}")
     except Exception as e:
         raise ValueError(f"Error parsing hair recommendations: {e}")
 
 
 @router.post("/makeup", response_model=MakeupRecommendationResponse)
-def get_makeup_recommendations_endpoint(request: MakeupRecommendationRequest):
+async def get_makeup_recommendations_endpoint(request: MakeupRecommendationRequest):
     """
     Get makeup recommendations based on face image and personal color type.
     
@@ -207,43 +359,49 @@ def get_makeup_recommendations_endpoint(request: MakeupRecommendationRequest):
     try:
         # Validate image
         try:
-            image, validation_result = validate_image_from_base64(
+            image, validation_result = await run_in_threadpool(
+                validate_image_from_base64,
                 request.face_image,
                 require_face=True,  # Makeup recommendations require face
                 max_dimension=4096,
                 min_dimension=100
             )
-            logger.debug(f"Image validated: {validation_result}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Image validated: %s", validation_result)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
         
         # Get makeup recommendations
-        result = get_makeup_recommendations(
+        result = await get_makeup_recommendations(
             image,
             personal_color_type=request.personal_color_type
         )
         
         process_time = time.time() - start_time
         logger.info(
-            f"Makeup recommendations completed: personal_color_type={result['personal_color_type']}, "
-            f"time={process_time:.2f}s"
+            "Makeup recommendations completed: personal_color_type=%s, time=%.2fs",
+            result["personal_color_type"], process_time,
+            extra={"personal_color_type": result["personal_color_type"], "duration": process_time}
         )
         
         return MakeupRecommendationResponse(**result)
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        logger.warning("Makeup recommendations rejected: %s", e)
+        raise HTTPException(status_code=503, detail="Recommendation service temporarily unavailable")
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(
-            f"Makeup recommendations failed: {str(e)}, time={process_time:.2f}s",
+            "Makeup recommendations failed: %s, time=%.2fs", e, process_time,
             exc_info=True
         )
         raise HTTPException(status_code=500, detail=f"Error getting makeup recommendations: {str(e)}")
 
 
 @router.post("/hair", response_model=HairRecommendationResponse)
-def get_hair_recommendations_endpoint(request: HairRecommendationRequest):
+async def get_hair_recommendations_endpoint(request: HairRecommendationRequest):
     """
     Get hair color and style recommendations based on face image and personal color type.
     
@@ -262,19 +420,21 @@ def get_hair_recommendations_endpoint(request: HairRecommendationRequest):
     try:
         # Validate image
         try:
-            image, validation_result = validate_image_from_base64(
+            image, validation_result = await run_in_threadpool(
+                validate_image_from_base64,
                 request.face_image,
                 require_face=True,  # Hair recommendations require face
                 max_dimension=4096,
                 min_dimension=100
             )
-            logger.debug(f"Image validated: {validation_result}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Image validated: %s", validation_result)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
         
         # Get hair recommendations
-        result = get_hair_recommendations(
+        result = await get_hair_recommendations(
             image,
             personal_color_type=request.personal_color_type,
             current_hair_color=request.current_hair_color
@@ -282,17 +442,21 @@ def get_hair_recommendations_endpoint(request: HairRecommendationRequest):
         
         process_time = time.time() - start_time
         logger.info(
-            f"Hair recommendations completed: personal_color_type={result['personal_color_type']}, "
-            f"time={process_time:.2f}s"
+            "Hair recommendations completed: personal_color_type=%s, time=%.2fs",
+            result["personal_color_type"], process_time,
+            extra={"personal_color_type": result["personal_color_type"], "duration": process_time}
         )
         
         return HairRecommendationResponse(**result)
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        logger.warning("Hair recommendations rejected: %s", e)
+        raise HTTPException(status_code=503, detail="Recommendation service temporarily unavailable")
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(
-            f"Hair recommendations failed: {str(e)}, time={process_time:.2f}s",
+            "Hair recommendations failed: %s, time=%.2fs", e, process_time,
             exc_info=True
         )
         raise HTTPException(status_code=500, detail=f"Error getting hair recommendations: {str(e)}")
@@ -1,77 +1,232 @@
 """
 Color analysis API endpoints.
 """
-from fastapi import APIRouter, UploadFile, File, Query, HTTPException
-from PIL import Image
-from io import BytesIO
-from typing import Literal
-import time
+from fastapi import APIRouter, Depends, UploadFile, File, Query, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from functools import lru_cache
+from typing import Awaitable, BinaryIO, Callable, Hashable, NamedTuple
+import asyncio
+import orjson
 from src.services import (
-    get_your_color_season,
+    aget_your_color_season,
     get_your_color_season_ensemble_parallel,
     get_your_color_season_ensemble_hybrid,
 )
-from src.models import AnalyzeColorSeasonRequest
+from src.models import AnalyzeColorSeasonRequest, AnalyzeColorSeasonResponseModel, ColorPaletteResponse
+from src.utils.cache import TTLCache, content_key
+from src.utils.image_utils import PreparedImage
+from src.utils.http_cache import cached_response, make_etag
 from src.utils.logger import get_logger
 from src.utils.image_validator import (
-    validate_image_from_bytes,
-    validate_image_from_base64,
+    validate_and_prepare,
+    run_in_image_pool,
     ImageValidationError
 )
 
 logger = get_logger("api.color")
 router = APIRouter(prefix="/api", tags=["color-analysis"])
 
+# UI retries and ensemble comparisons often resubmit the same image. Analysis
+# results are cached by the services; this layer keeps validated images as
+# the downscaled JPEG sent to every LLM provider (~100-300 KB each), by a
+# hash of the submitted payload, so a hit skips decoding and face detection.
+# Decoded pixels are never cached: at up to 4096x4096 they would cost ~50 MB each
+_prepared_images = TTLCache(maxsize=64, ttl=600)
+# One in-flight analysis per key; concurrent duplicates await the same task
+_inflight: dict[Hashable, asyncio.Task] = {}
 
-@router.post("/test/analyze/color")
-async def test_upload_image(file: UploadFile = File(...)):
+
+# Accepted ensemble query parameters, checked with a set lookup instead of
+# a per-request pydantic Literal validator
+_AGG_METHODS = frozenset({"voting", "weighted_average", "consensus"})
+_JUDGE_MODELS = frozenset({"gemini", "openai", "claude"})
+
+
+def _validate_agg_method(
+    aggregation_method: str = Query(
+        default="weighted_average",
+        description="Method to aggregate results from multiple models: voting, weighted_average or consensus"
+    )
+) -> str:
+    """Validate the ensemble aggregation_method query parameter."""
+    if aggregation_method not in _AGG_METHODS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid aggregation_method '{aggregation_method}'. Allowed: {', '.join(sorted(_AGG_METHODS))}"
+        )
+    return aggregation_method
+
+
+def _validate_judge_model(
+    judge_model: str = Query(
+        default="gemini",
+        description="Which model acts as judge/evaluator: gemini, openai or claude"
+    )
+) -> str:
+    """Validate the ensemble judge_model query parameter."""
+    if judge_model not in _JUDGE_MODELS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid judge_model '{judge_model}'. Allowed: {', '.join(sorted(_JUDGE_MODELS))}"
+        )
+    return judge_model
+
+
+def _content_key(payload: bytes | str) -> bytes:
+    """Hash raw bytes or a base64 string (cheaper than decoding it first)."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return content_key(payload)
+
+
+def _read_with_key(payload: str | BinaryIO) -> tuple[bytes, bytes | str]:
+    """Read an upload out of its spooled file if needed and hash it."""
+    if not isinstance(payload, str):
+        payload.seek(0)
+        payload = payload.read()
+    return _content_key(payload), payload
+
+
+async def _validate_cached(payload: str | BinaryIO) -> tuple[bytes, PreparedImage]:
     """
-    Test endpoint: Analyze color season from uploaded image file.
+    Validate a color-analysis image and prepare it for LLM providers.
     
-    Use this for testing directly in FastAPI docs with file upload.
+    Decoding, face detection and JPEG encoding run as one task in the image
+    process pool, so concurrent requests validate in parallel instead of
+    contending for the GIL, and only the JPEG comes back. Uploads are read
+    into bytes here: the content key needs them, and a stream cannot be sent
+    to the pool. Repeated payloads reuse the prepared image and skip
+    validation.
+    
+    Returns:
+        Tuple of (content key, prepared image)
     """
-    start_time = time.time()
-    logger.info("Test color analysis request received (file upload)")
+    image_key, data = await run_in_threadpool(_read_with_key, payload)
+    prepared = _prepared_images.get(image_key)
+    if prepared is None:
+        prepared, validation_result = await run_in_image_pool(
+            validate_and_prepare,
+            data,
+            True,  # Color analysis requires face
+            4096,  # max_dimension
+            100    # min_dimension
+        )
+        logger.debug("Image validated: %s", validation_result)
+        _prepared_images.set(image_key, prepared)
+    return image_key, prepared
+
+
+async def _run_analysis(
+    analyze: Callable[[], Awaitable[AnalyzeColorSeasonResponseModel]]
+) -> tuple[AnalyzeColorSeasonResponseModel, bytes]:
+    """Run analyze() and serialize the result once for every waiting request."""
+    result = await analyze()
+    return result, result.model_dump_json().encode()
+
+
+async def _shared_analysis(
+    key: Hashable,
+    analyze: Callable[[], Awaitable[AnalyzeColorSeasonResponseModel]]
+) -> tuple[AnalyzeColorSeasonResponseModel, bytes]:
+    """
+    Run analyze() once for concurrent duplicates.
+    
+    Duplicates submitted while an analysis is in flight (e.g. UI retries)
+    await the same task and share its result or its error, so N concurrent
+    requests pay for one LLM call. The task is shielded: a client that
+    disconnects does not cancel it for the others. Later repeats are served
+    from the services' color season cache.
     
+    Returns:
+        Tuple of (result, JSON body)
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_run_analysis(analyze))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _run_color_analysis(
+    payload: str | BinaryIO,
+    analysis_key: tuple,
+    analyze: Callable[[PreparedImage], Awaitable[AnalyzeColorSeasonResponseModel]],
+    label: str,
+    *label_args
+) -> Response | dict:
+    """
+    Shared body of the color analysis endpoints.
+    
+    Validates the image, runs (or reuses) the analysis, logs and returns the
+    serialized result. Failures other than invalid images return {"error": ...}.
+    
+    Args:
+        payload: Uploaded file stream or base64 string
+        analysis_key: Analysis name and parameters; the image content key is
+            appended to deduplicate concurrent requests
+        analyze: Service call taking the validated, prepared image
+        label: Log label, %-formatted with label_args (e.g. "Ensemble parallel analysis (method=%s)")
+    
+    Returns:
+        JSON response with the analysis, or an error dict
+    """
     try:
-        contents = await file.read()
-        
         # Validate image
         try:
-            image, validation_result = validate_image_from_bytes(
-                contents,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
+            image_key, prepared = await _validate_cached(payload)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
-        
-        result = get_your_color_season(image)
-        process_time = time.time() - start_time
+
+        result, body = await _shared_analysis((*analysis_key, image_key), lambda: analyze(prepared))
         logger.info(
-            f"Test color analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, time={process_time:.2f}s"
+            label + " completed: season=%s, confidence=%.2f",
+            *label_args, result.personal_color_type, result.confidence
         )
-        return result.model_dump()
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Test color analysis failed: {str(e)}, time={process_time:.2f}s",
-            exc_info=True
-        )
+        logger.error(label + " failed: %s", *label_args, e, exc_info=True)
         return {"error": str(e)}
 
 
-@router.post("/analyze/color")
-def get_color_season(request: AnalyzeColorSeasonRequest):
+@router.post("/test/analyze/color")
+async def test_upload_image(file: UploadFile = File(...)):
+    """
+    Test endpoint: Analyze color season from uploaded image file.
+    
+    Use this for testing directly in FastAPI docs with file upload.
+    """
+    logger.info("Test color analysis request received (file upload)")
+    
+    return await _run_color_analysis(file.file, ("color",), aget_your_color_season, "Test color analysis")
+
+
+@router.post("/analyze/color/upload")
+async def analyze_color_upload(file: UploadFile = File(...)):
+    """
+    Analyze color season from an uploaded image file (single model - Gemini).
+    
+    Preferred over the base64 JSON endpoint: multipart uploads are ~33% smaller
+    and skip JSON parsing of the encoded image string.
+    
+    Returns:
+        Personal color analysis results including season, undertone, confidence, etc.
+    """
+    logger.info("Color analysis request received (file upload - Gemini)")
+    
+    return await _run_color_analysis(file.file, ("color",), aget_your_color_season, "Color analysis")
+
+
+@router.post("/analyze/color", deprecated=True)
+async def get_color_season(request: AnalyzeColorSeasonRequest):
     """
     Analyze color season from a base64-encoded image (single model - Gemini).
     
+    Legacy: prefer POST /api/analyze/color/upload with a multipart file.
+    
     Request body should contain:
     {
         "image": "data:image/png;base64,iVBORw0KGgo..." or just "iVBORw0KGgo..."
@@ -80,48 +235,15 @@ def get_color_season(request: AnalyzeColorSeasonRequest):
     Returns:
         Personal color analysis results including season, undertone, confidence, etc.
     """
-    start_time = time.time()
     logger.info("Color analysis request received (single model - Gemini)")
     
-    try:
-        # Validate image
-        try:
-            image, validation_result = validate_image_from_base64(
-                request.image,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = get_your_color_season(image)
-        process_time = time.time() - start_time
-        logger.info(
-            f"Color analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, time={process_time:.2f}s"
-        )
-        return result.model_dump()
-    except HTTPException:
-        raise
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Color analysis failed: {str(e)}, time={process_time:.2f}s",
-            exc_info=True
-        )
-        return {"error": str(e)}
+    return await _run_color_analysis(request.image, ("color",), aget_your_color_season, "Color analysis")
 
 
 @router.post("/analyze/color/ensemble/parallel")
 async def get_color_season_ensemble_parallel(
     request: AnalyzeColorSeasonRequest,
-    aggregation_method: Literal["voting", "weighted_average", "consensus"] = Query(
-        default="weighted_average",
-        description="Method to aggregate results from multiple models"
-    )
+    aggregation_method: str = Depends(_validate_agg_method)
 ):
     """
     Analyze color season using ensemble of 3 models (Gemini, OpenAI, Claude) in parallel.
@@ -141,51 +263,20 @@ async def get_color_season_ensemble_parallel(
     Returns:
         Aggregated personal color analysis results from all models.
     """
-    start_time = time.time()
-    logger.info(f"Ensemble parallel color analysis request received (method={aggregation_method})")
+    logger.info("Ensemble parallel color analysis request received (method=%s)", aggregation_method)
     
-    try:
-        # Validate image
-        try:
-            image, validation_result = validate_image_from_base64(
-                request.image,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = await get_your_color_season_ensemble_parallel(
-            image,
-            aggregation_method=aggregation_method
-        )
-        process_time = time.time() - start_time
-        logger.info(
-            f"Ensemble parallel analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, method={aggregation_method}, time={process_time:.2f}s"
-        )
-        return result.model_dump()
-    except HTTPException:
-        raise
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Ensemble parallel analysis failed: {str(e)}, method={aggregation_method}, time={process_time:.2f}s",
-            exc_info=True
-        )
-        return {"error": str(e)}
+    return await _run_color_analysis(
+        request.image,
+        ("ensemble_parallel", aggregation_method),
+        lambda image: get_your_color_season_ensemble_parallel(image, aggregation_method=aggregation_method),
+        "Ensemble parallel analysis (method=%s)", aggregation_method
+    )
 
 
 @router.post("/analyze/color/ensemble/hybrid")
 async def get_color_season_ensemble_hybrid(
     request: AnalyzeColorSeasonRequest,
-    judge_model: Literal["gemini", "openai", "claude"] = Query(
-        default="gemini",
-        description="Which model acts as judge/evaluator"
-    )
+    judge_model: str = Depends(_validate_judge_model)
 ):
     """
     Analyze color season using hybrid ensemble approach.
@@ -204,147 +295,53 @@ async def get_color_season_ensemble_hybrid(
     Returns:
         Judged personal color analysis results with expert evaluation.
     """
-    start_time = time.time()
-    logger.info(f"Ensemble hybrid color analysis request received (judge_model={judge_model})")
+    logger.info("Ensemble hybrid color analysis request received (judge_model=%s)", judge_model)
     
-    try:
-        # Validate image
-        try:
-            image, validation_result = validate_image_from_base64(
-                request.image,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = await get_your_color_season_ensemble_hybrid(
-            image,
-            judge_model=judge_model
-        )
-        process_time = time.time() - start_time
-        logger.info(
-            f"Ensemble hybrid analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, judge_model={judge_model}, time={process_time:.2f}s"
-        )
-        return result.model_dump()
-    except HTTPException:
-        raise
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Ensemble hybrid analysis failed: {str(e)}, judge_model={judge_model}, time={process_time:.2f}s",
-            exc_info=True
-        )
-        return {"error": str(e)}
+    return await _run_color_analysis(
+        request.image,
+        ("ensemble_hybrid", judge_model),
+        lambda image: get_your_color_season_ensemble_hybrid(image, judge_model=judge_model),
+        "Ensemble hybrid analysis (judge_model=%s)", judge_model
+    )
 
 
 @router.post("/test/analyze/color/ensemble/parallel")
 async def test_upload_image_ensemble_parallel(
     file: UploadFile = File(...),
-    aggregation_method: Literal["voting", "weighted_average", "consensus"] = Query(
-        default="weighted_average",
-        description="Method to aggregate results from multiple models"
-    )
+    aggregation_method: str = Depends(_validate_agg_method)
 ):
     """
     Test endpoint: Analyze color season from uploaded image file using ensemble of 3 models in parallel.
     
     Use this for testing directly in FastAPI docs with file upload.
     """
-    start_time = time.time()
-    logger.info(f"Test ensemble parallel color analysis request received (file upload, method={aggregation_method})")
+    logger.info("Test ensemble parallel color analysis request received (file upload, method=%s)", aggregation_method)
     
-    try:
-        contents = await file.read()
-        
-        # Validate image
-        try:
-            image, validation_result = validate_image_from_bytes(
-                contents,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = await get_your_color_season_ensemble_parallel(
-            image,
-            aggregation_method=aggregation_method
-        )
-        process_time = time.time() - start_time
-        logger.info(
-            f"Test ensemble parallel analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, method={aggregation_method}, time={process_time:.2f}s"
-        )
-        return result.model_dump()
-    except HTTPException:
-        raise
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Test ensemble parallel analysis failed: {str(e)}, method={aggregation_method}, time={process_time:.2f}s",
-            exc_info=True
-        )
-        return {"error": str(e)}
+    return await _run_color_analysis(
+        file.file,
+        ("ensemble_parallel", aggregation_method),
+        lambda image: get_your_color_season_ensemble_parallel(image, aggregation_method=aggregation_method),
+        "Test ensemble parallel analysis (method=%s)", aggregation_method
+    )
 
 @router.post("/test/analyze/color/ensemble/hybrid")
 async def test_upload_image_ensemble_hybrid(
     file: UploadFile = File(...),
-    judge_model: Literal["gemini", "openai", "claude"] = Query(
-        default="gemini",
-        description="Which model acts as judge/evaluator"
-    )
+    judge_model: str = Depends(_validate_judge_model)
 ):
     """
     Test endpoint: Analyze color season from uploaded image file using ensemble of 3 models in hybrid.
     
     Use this for testing directly in FastAPI docs with file upload.
     """
-    start_time = time.time()
-    logger.info(f"Test ensemble hybrid color analysis request received (file upload, judge_model={judge_model})")
+    logger.info("Test ensemble hybrid color analysis request received (file upload, judge_model=%s)", judge_model)
     
-    try:
-        contents = await file.read()
-        
-        # Validate image
-        try:
-            image, validation_result = validate_image_from_bytes(
-                contents,
-                require_face=True,  # Color analysis requires face
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Image validated: {validation_result}")
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = await get_your_color_season_ensemble_hybrid(
-            image,
-            judge_model=judge_model
-        )
-        process_time = time.time() - start_time
-        logger.info(
-            f"Test ensemble hybrid analysis completed: season={result.personal_color_type}, "
-            f"confidence={result.confidence:.2f}, judge_model={judge_model}, time={process_time:.2f}s"
-        )
-        return result.model_dump()
-    except HTTPException:
-        raise
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Test ensemble hybrid analysis failed: {str(e)}, judge_model={judge_model}, time={process_time:.2f}s",
-            exc_info=True
-        )
-        return {"error": str(e)}
+    return await _run_color_analysis(
+        file.file,
+        ("ensemble_hybrid", judge_model),
+        lambda image: get_your_color_season_ensemble_hybrid(image, judge_model=judge_model),
+        "Test ensemble hybrid analysis (judge_model=%s)", judge_model
+    )
 
 
 # Color palette data for each season
@@ -416,8 +413,73 @@ COLOR_PALETTES = {
 }
 
 
-@router.get("/color/palette/{season}")
-def get_color_palette(season: str):
+# Lookup structures for get_color_palette, built once at import
+_SEASON_NAMES = tuple(COLOR_PALETTES)
+_AVAILABLE_SEASONS = str(list(_SEASON_NAMES))  # as shown in notes and errors
+# Message templates that echo the query; the season list is formatted in once
+_PARTIAL_MATCH_NOTE = "Matched '%s' to '%s'. Available seasons: " + _AVAILABLE_SEASONS
+_NOT_FOUND_DETAIL = "Color palette not found for season '%s'. Available seasons: " + _AVAILABLE_SEASONS
+_PALETTES_LOWER = {name.lower(): name for name in _SEASON_NAMES}
+# Palettes never change, so exact-match responses are serialized and tagged once
+_PALETTE_JSON = {
+    name: orjson.dumps({"season": name, "palette": palette})
+    for name, palette in COLOR_PALETTES.items()
+}
+_PALETTE_ETAGS = {name: make_etag(body) for name, body in _PALETTE_JSON.items()}
+
+
+def _partial_season_match(season_lower: str) -> str | None:
+    """Find the first season (in palette order) containing, or contained in, the query."""
+    for key_lower, key in _PALETTES_LOWER.items():
+        if season_lower in key_lower or key_lower in season_lower:
+            return key
+    return None
+
+
+class _PaletteMatch(NamedTuple):
+    """A resolved palette query with its serialized response."""
+    season: str | None  # canonical season; None when nothing matched (404)
+    match_type: str     # "exact", "case-insensitive", "partial" or "none"
+    body: bytes
+    etag: str | None    # set for exact/case-insensitive matches, whose body is shared
+
+
+@lru_cache(maxsize=1024)
+def _resolve_season(season: str) -> _PaletteMatch:
+    """
+    Resolve a raw season query to its canonical season and response body.
+    
+    Palettes are static, so results are cached per raw query with no expiry.
+    Exact and case-insensitive matches share the prebuilt bodies; the
+    partial-match note and the 404 detail echo the query, so those bodies
+    are built on the first miss.
+    """
+    season_normalized = season.strip()
+    
+    # Try exact match first, then case-insensitive
+    if season_normalized in COLOR_PALETTES:
+        key, match_type = season_normalized, "exact"
+    else:
+        key, match_type = _PALETTES_LOWER.get(season_normalized.lower()), "case-insensitive"
+    if key is not None:
+        return _PaletteMatch(key, match_type, _PALETTE_JSON[key], _PALETTE_ETAGS[key])
+    
+    # Try partial match (e.g., "Autumn" matches "Deep Autumn", "Warm Autumn", etc.)
+    best_match = _partial_season_match(season_normalized.lower())
+    if best_match is None:
+        return _PaletteMatch(None, "none", orjson.dumps({
+            "detail": _NOT_FOUND_DETAIL % season
+        }), None)
+    return _PaletteMatch(best_match, "partial", orjson.dumps({
+        "season": best_match,
+        "palette": COLOR_PALETTES[best_match],
+        "note": _PARTIAL_MATCH_NOTE % (season, best_match)
+    }), None)
+
+
+# response_model documents the schema; handlers return prebuilt JSON bytes
+@router.get("/color/palette/{season}", response_model=ColorPaletteResponse)
+def get_color_palette(season: str, request: Request):
     """
     Get color palette (HEX colors) for a specific personal color season.
     
@@ -427,45 +489,13 @@ def get_color_palette(season: str):
     Returns:
         Dictionary containing primary, secondary, and accent color arrays in HEX format
     """
-    logger.info(f"Get color palette request: season={season}")
+    match = _resolve_season(season)
     
-    # Normalize season name (handle variations)
-    season_normalized = season.strip()
+    if match.season is None:
+        logger.warning("Color palette not found for season=%s", season)
+        return Response(content=match.body, status_code=404, media_type="application/json")
     
-    # Try exact match first
-    if season_normalized in COLOR_PALETTES:
-        palette = COLOR_PALETTES[season_normalized]
-        logger.info(f"Found palette for season={season}")
-        return {
-            "season": season_normalized,
-            "palette": palette
-        }
-    
-    # Try case-insensitive match
-    season_lower = season_normalized.lower()
-    for key, value in COLOR_PALETTES.items():
-        if key.lower() == season_lower:
-            logger.info(f"Found palette for season={season} (case-insensitive match: {key})")
-            return {
-                "season": key,
-                "palette": value
-            }
-    
-    # Try partial match (e.g., "Autumn" matches "Deep Autumn", "Warm Autumn", etc.)
-    matching_seasons = [k for k in COLOR_PALETTES.keys() if season_lower in k.lower() or k.lower() in season_lower]
-    if matching_seasons:
-        # Return the first match, or prefer exact subtype match
-        best_match = matching_seasons[0]
-        logger.info(f"Found palette for season={season} (partial match: {best_match})")
-        return {
-            "season": best_match,
-            "palette": COLOR_PALETTES[best_match],
-            "note": f"Matched '{season}' to '{best_match}'. Available seasons: {list(COLOR_PALETTES.keys())}"
-        }
-    
-    # No match found
-    logger.warning(f"Color palette not found for season={season}")
-    raise HTTPException(
-        status_code=404,
-        detail=f"Color palette not found for season '{season}'. Available seasons: {list(COLOR_PALETTES.keys())}"
-    )
\ No newline at end of file
+    logger.info("Found palette for season=%s (%s match: %s)", season, match.match_type, match.season)
+    if match.etag is not None:
+        return cached_response(request, match.body, match.etag)
+    return Response(content=match.body, media_type="application/json")
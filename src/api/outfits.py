@@ -1,10 +1,16 @@
 """
 Outfit-related API endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Hashable
+from pathlib import Path
 import time
-import json
-import os
+import orjson
+from pydantic import ValidationError
 from src.database.db import (
     get_outfit_by_season as db_get_outfit_by_season,
     get_outfit_by_category as db_get_outfit_by_category,
@@ -13,6 +19,8 @@ from src.database.db import (
 from src.database.popularity import like_item, get_item_popularity
 from src.models import LikeItemRequest, OutfitScoreRequest, OutfitScoreResponse
 from src.services.stylist import score_outfit_compatibility
+from src.utils.cache import TTLCache, content_key
+from src.utils.http_cache import cached_response, make_etag
 from src.utils.logger import get_logger
 from src.utils.image_validator import (
     validate_image_from_base64,
@@ -22,6 +30,75 @@ from src.utils.image_validator import (
 logger = get_logger("api.outfits")
 router = APIRouter(prefix="/api/outfit", tags=["outfits"])
 
+_BRAND_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "lacoste_coupang_combined.json"
+
+# Serialized GET responses, keyed by path params: (body, etag, item or like count).
+# Listings are also cached by the DB layer, so this saves serialization;
+# popularity-sorted listings and like counts change with every like, so they
+# get short TTLs and are refreshed by like_outfit_item.
+_listing_responses = TTLCache(maxsize=512, ttl=60)
+_ranked_responses = TTLCache(maxsize=512, ttl=5)
+_popularity_responses = TTLCache(maxsize=4096, ttl=5)
+# Like counts change on every like; clients revalidate with If-None-Match
+POPULARITY_MAX_AGE = 5  # seconds
+# Outfit scores by (image content, personal color type): apps re-POST the
+# same photo on retries and navigation
+_score_results = TTLCache(maxsize=1024, ttl=3600)
+# Largest page accepted by paginated listings
+MAX_PAGE_SIZE = 200
+
+
+def _serialize(content: Any) -> tuple[bytes, str, int]:
+    """Serialize content to JSON bytes with its ETag and item count."""
+    body = orjson.dumps(content)
+    return body, make_etag(body), len(content)
+
+
+def _popularity_entry(item_id: str, popularity: int) -> tuple[bytes, str, int]:
+    """Serialize an item's popularity to JSON bytes with its ETag and like count."""
+    body = orjson.dumps({"item_id": item_id, "popularity": popularity})
+    return body, make_etag(body), popularity
+
+
+async def _cached_query(
+    cache: TTLCache,
+    key: Hashable,
+    query: Callable[..., list[dict]],
+    *args,
+    **kwargs
+) -> tuple[bytes, str, int]:
+    """
+    Run a DB query in the threadpool on cache miss and cache its serialized result.
+    
+    Returns:
+        Tuple of (JSON body, ETag, number of items)
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = _serialize(await run_in_threadpool(query, *args, **kwargs))
+        cache.set(key, entry)
+    return entry
+
+
+@lru_cache(maxsize=1)
+def load_brand_data() -> dict[tuple[str, str], tuple[bytes, int]]:
+    """
+    Parse the static brand export once and pre-serialize it per filter.
+    
+    Called at startup, so get_outfit_by_brand only does a dict lookup. If the
+    preload failed, lru_cache does not keep the error and each request retries
+    the blocking load, which is why the endpoint runs in the threadpool.
+    
+    Returns:
+        Dictionary mapping (personalColorType, category) to (JSON body, item count)
+    """
+    outfits = orjson.loads(_BRAND_DATA_PATH.read_bytes())
+    index: dict[tuple[str, str], list[dict]] = defaultdict(list)
+    for outfit in outfits:
+        index[outfit["personalColorType"], outfit["category"]].append(outfit)
+    return {key: (orjson.dumps(items), len(items)) for key, items in index.items()}
+
+
 #TODO: testing endpoint, delete it later
 @router.get("/season/{season}/category/{category}/brand/{brand}")
 def get_outfit_by_brand(season: str, category: str, brand: str):
@@ -36,24 +113,17 @@ def get_outfit_by_brand(season: str, category: str, brand: str):
     Returns:
         List of outfit items matching all filters
     """
-    
     try:
-        # Construct absolute path to the data file
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        data_path = os.path.join(base_dir, "data", "lacoste_coupang_combined.json")
-        
-        with open(data_path, "r") as f:
-            results = json.load(f)
-            # Dont have brand filter in data so skip it
-            results = [outfit for outfit in results if outfit["personalColorType"] == season and outfit["category"] == category]
-            logger.info(f"Found {len(results)} outfits for season={season}, category={category}")
-        return results
+        # The export has no brand field, so every brand is served from the same file
+        body, count = load_brand_data().get((season, category), (b"[]", 0))
+        logger.info("Found %d outfits for season=%s, category=%s", count, season, category)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting outfits by season={season}, category={category}: {str(e)}", exc_info=True)
+        logger.error("Error getting outfits by season=%s, category=%s: %s", season, category, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving outfits: {str(e)}")
 
 @router.get("/season/{season}")
-def get_outfit_by_season(season: str):
+async def get_outfit_by_season(season: str, request: Request):
     """
     Get outfits filtered by personal color season/type.
     
@@ -63,19 +133,21 @@ def get_outfit_by_season(season: str):
     Returns:
         List of outfit items matching the season
     """
-    logger.info(f"Get outfits by season request: season={season}")
+    logger.info("Get outfits by season request: season=%s", season)
     
     try:
-        results = db_get_outfit_by_season(season)
-        logger.info(f"Found {len(results)} outfits for season={season}")
-        return results
+        body, etag, count = await _cached_query(
+            _listing_responses, ("season", season), db_get_outfit_by_season, season
+        )
+        logger.info("Found %d outfits for season=%s", count, season)
+        return cached_response(request, body, etag=etag)
     except Exception as e:
-        logger.error(f"Error getting outfits by season={season}: {str(e)}", exc_info=True)
+        logger.error("Error getting outfits by season=%s: %s", season, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving outfits: {str(e)}")
 
 
 @router.get("/category/{category}")
-def get_outfit_by_category(category: str):
+async def get_outfit_by_category(category: str, request: Request):
     """
     Get outfits filtered by category.
     
@@ -85,38 +157,52 @@ def get_outfit_by_category(category: str):
     Returns:
         List of outfit items matching the category
     """
-    logger.info(f"Get outfits by category request: category={category}")
+    logger.info("Get outfits by category request: category=%s", category)
     
     try:
-        results = db_get_outfit_by_category(category)
-        logger.info(f"Found {len(results)} outfits for category={category}")
-        return results
+        body, etag, count = await _cached_query(
+            _listing_responses, ("category", category), db_get_outfit_by_category, category
+        )
+        logger.info("Found %d outfits for category=%s", count, category)
+        return cached_response(request, body, etag=etag)
     except Exception as e:
-        logger.error(f"Error getting outfits by category={category}: {str(e)}", exc_info=True)
+        logger.error("Error getting outfits by category=%s: %s", category, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving outfits: {str(e)}")
 
 
 @router.get("/season/{season}/category/{category}")
-def get_outfit_by_season_and_category(season: str, category: str):
+async def get_outfit_by_season_and_category(
+    season: str,
+    category: str,
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+    offset: int = Query(0, ge=0, description="Number of items to skip")
+):
     """
     Get outfits filtered by both season and category, sorted by popularity (most popular first).
     
     Args:
         season: Personal color type
         category: Product category
+        limit: Page size (all items when omitted)
+        offset: Page start
     
     Returns:
         List of outfit items matching both filters, sorted by popularity (highest first)
         Each item includes a 'popularity' field showing the number of likes.
     """
-    logger.info(f"Get outfits by season and category request: season={season}, category={category}")
+    logger.info("Get outfits by season and category request: season=%s, category=%s", season, category)
     
     try:
-        results = db_get_outfit_by_season_and_category(season, category, sort_by_popularity=True)
-        logger.info(f"Found {len(results)} outfits for season={season}, category={category}")
-        return results
+        body, etag, count = await _cached_query(
+            _ranked_responses, (season, category, limit, offset),
+            db_get_outfit_by_season_and_category, season, category,
+            sort_by_popularity=True, limit=limit, offset=offset
+        )
+        logger.info("Found %d outfits for season=%s, category=%s", count, season, category)
+        return cached_response(request, body, etag=etag)
     except Exception as e:
-        logger.error(f"Error getting outfits by season={season}, category={category}: {str(e)}", exc_info=True)
+        logger.error("Error getting outfits by season=%s, category=%s: %s", season, category, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving outfits: {str(e)}")
 
 
@@ -134,11 +220,14 @@ def like_outfit_item(request: LikeItemRequest):
     Returns:
         Success message with new popularity count
     """
-    logger.info(f"Like outfit item request: item_id={request.item_id}")
+    logger.info("Like outfit item request: item_id=%s", request.item_id)
     
     try:
         new_count = like_item(request.item_id)
-        logger.info(f"Item {request.item_id} liked successfully, new popularity count: {new_count}")
+        # Write the new count through and drop rankings that may now be out of order
+        _popularity_responses.set(request.item_id, _popularity_entry(request.item_id, new_count))
+        _ranked_responses.clear()
+        logger.info("Item %s liked successfully, new popularity count: %s", request.item_id, new_count)
         return {
             "success": True,
             "message": f"Item {request.item_id} liked successfully",
@@ -146,12 +235,12 @@ def like_outfit_item(request: LikeItemRequest):
             "popularity": new_count
         }
     except Exception as e:
-        logger.error(f"Error liking item {request.item_id}: {str(e)}", exc_info=True)
+        logger.error("Error liking item %s: %s", request.item_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error liking item: {str(e)}")
 
 
 @router.get("/popularity/{item_id}")
-def get_item_popularity_endpoint(item_id: str):
+def get_item_popularity_endpoint(item_id: str, request: Request):
     """
     Get the current popularity (like count) for a specific item.
     
@@ -161,22 +250,52 @@ def get_item_popularity_endpoint(item_id: str):
     Returns:
         Popularity information for the item
     """
-    logger.info(f"Get item popularity request: item_id={item_id}")
+    logger.info("Get item popularity request: item_id=%s", item_id)
     
     try:
-        popularity = get_item_popularity(item_id)
-        logger.debug(f"Item {item_id} popularity: {popularity}")
-        return {
-            "item_id": item_id,
-            "popularity": popularity
-        }
+        entry = _popularity_responses.get(item_id)
+        if entry is None:
+            entry = _popularity_entry(item_id, get_item_popularity(item_id))
+            _popularity_responses.set(item_id, entry)
+        body, etag, popularity = entry
+        logger.debug("Item %s popularity: %s", item_id, popularity)
+        return cached_response(request, body, etag=etag, max_age=POPULARITY_MAX_AGE)
     except Exception as e:
-        logger.error(f"Error getting popularity for item {item_id}: {str(e)}", exc_info=True)
+        logger.error("Error getting popularity for item %s: %s", item_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving popularity: {str(e)}")
 
 
-@router.post("/score", response_model=OutfitScoreResponse)
-def score_outfit(request: OutfitScoreRequest):
+async def _read_score_request(http_request: Request) -> OutfitScoreRequest:
+    """
+    Parse the /score body straight from bytes with pydantic's JSON parser.
+    
+    FastAPI would json.loads the body into Python objects first and validate
+    them afterwards; for a multi-megabyte base64 image that is a second pass
+    over the payload.
+    
+    Raises:
+        RequestValidationError: 422 if the body is not a valid OutfitScoreRequest
+    """
+    try:
+        return OutfitScoreRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Same error locations as FastAPI's own body validation
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+@router.post(
+    "/score",
+    response_model=OutfitScoreResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": OutfitScoreRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+async def score_outfit(http_request: Request):
     """
     Score outfit compatibility based on user image and personal color type.
     
@@ -184,47 +303,59 @@ def score_outfit(request: OutfitScoreRequest):
     detailed feedback with scores for color harmony and style match.
     
     Args:
-        request: Contains user_image (base64), optional personal_color_type, and optional outfit_items
+        http_request: JSON OutfitScoreRequest body with user_image (base64), optional
+            personal_color_type, and optional outfit_items
     
     Returns:
         OutfitScoreResponse with compatibility scores, feedback, strengths, and improvements
     """
+    request = await _read_score_request(http_request)
     start_time = time.time()
     logger.info("Outfit score request received")
     
     try:
+        cache_key = (content_key(request.user_image.encode("utf-8")), request.personal_color_type)
+        cached = _score_results.get(cache_key)
+        if cached is not None:
+            logger.info("Outfit score served from cache: score=%.2f", cached.score)
+            return cached
+        
         # Validate image
         try:
-            image, validation_result = validate_image_from_base64(
+            image, validation_result = await run_in_threadpool(
+                validate_image_from_base64,
                 request.user_image,
                 require_face=True,  # Outfit scoring requires face for color analysis
                 max_dimension=4096,
                 min_dimension=100
             )
-            logger.debug(f"Image validated: {validation_result}")
+            logger.debug("Image validated: %s", validation_result)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
         
         # Score outfit compatibility
-        result = score_outfit_compatibility(
+        result = await run_in_threadpool(
+            score_outfit_compatibility,
             image,
             personal_color_type=request.personal_color_type
         )
         
         process_time = time.time() - start_time
         logger.info(
-            f"Outfit score completed: score={result['score']:.2f}, "
-            f"level={result['compatibility_level']}, time={process_time:.2f}s"
+            "Outfit score completed: score=%.2f, level=%s, time=%.2fs",
+            result["score"], result["compatibility_level"], process_time
         )
         
-        return OutfitScoreResponse(**result)
+        response = OutfitScoreResponse(**result)
+        _score_results.set(cache_key, response)
+        return response
     except HTTPException:
         raise
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(
-            f"Outfit scoring failed: {str(e)}, time={process_time:.2f}s",
+            "Outfit scoring failed: %s, time=%.2fs", e, process_time,
             exc_info=True
         )
         raise HTTPException(status_code=500, detail=f"Error scoring outfit: {str(e)}")
@@ -1,12 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from src.services.stylist import get_your_face_shape, get_your_body_shape
-from fastapi import UploadFile, File
-from PIL import Image
-from io import BytesIO
+from src.models import BodyShapeResponse, FaceShapeResponse
 from src.utils.logger import get_logger
 from src.utils.image_validator import (
     validate_image_from_bytes,
-    validate_image_from_base64,
     ImageValidationError
 )
 import time
@@ -14,7 +12,7 @@ import time
 logger = get_logger("api.shape")
 router = APIRouter(prefix="/api/shape", tags=["shape"])
 
-@router.post("/face")
+@router.post("/face", response_model=FaceShapeResponse)
 def get_face_shape(image: str):
     start_time = time.time()
     logger.info("Face shape analysis request received (base64)")
@@ -22,14 +20,14 @@ def get_face_shape(image: str):
     try:
         result = get_your_face_shape(image)
         process_time = time.time() - start_time
-        logger.info(f"Face shape analysis completed: shape={result.face_shape}, confidence={result.confidence:.2f}, time={process_time:.2f}s")
-        return result.model_dump()
+        logger.info("Face shape analysis completed: shape=%s, confidence=%.2f, time=%.2fs", result.face_shape, result.confidence, process_time)
+        return result
     except Exception as e:
         process_time = time.time() - start_time
-        logger.error(f"Face shape analysis failed: {str(e)}, time={process_time:.2f}s", exc_info=True)
+        logger.error("Face shape analysis failed: %s, time=%.2fs", e, process_time, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing face shape: {str(e)}")
 
-@router.post("/test/analyze/face")
+@router.post("/test/analyze/face", response_model=FaceShapeResponse)
 async def test_upload_face_image(file: UploadFile = File(...)):
     """
     Test endpoint: Analyze face shape from uploaded image file.
@@ -44,28 +42,29 @@ async def test_upload_face_image(file: UploadFile = File(...)):
         
         # Validate image (face shape analysis requires face)
         try:
-            image, validation_result = validate_image_from_bytes(
+            image, validation_result = await run_in_threadpool(
+                validate_image_from_bytes,
                 contents,
                 require_face=True,
                 max_dimension=4096,
                 min_dimension=100
             )
-            logger.debug(f"Face image validated: {validation_result}")
+            logger.debug("Face image validated: %s", validation_result)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
         
-        result = get_your_face_shape(image)
+        result = await run_in_threadpool(get_your_face_shape, image)
         process_time = time.time() - start_time
-        logger.info(f"Face shape analysis completed: shape={result.face_shape}, confidence={result.confidence:.2f}, time={process_time:.2f}s")
+        logger.info("Face shape analysis completed: shape=%s, confidence=%.2f, time=%.2fs", result.face_shape, result.confidence, process_time)
         
-        return {"face_shape": result.face_shape, "confidence": result.confidence, "reasoning": result.reasoning}
+        return result
     except Exception as e:
         process_time = time.time() - start_time
-        logger.error(f"Face shape analysis failed: {str(e)}, time={process_time:.2f}s", exc_info=True)
+        logger.error("Face shape analysis failed: %s, time=%.2fs", e, process_time, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing face shape: {str(e)}")
 
-@router.post("/body")
+@router.post("/body", response_model=BodyShapeResponse)
 def get_body_shape(image: str):
     start_time = time.time()
     logger.info("Body shape analysis request received (base64)")
@@ -73,14 +72,14 @@ def get_body_shape(image: str):
     try:
         result = get_your_body_shape(image)
         process_time = time.time() - start_time
-        logger.info(f"Body shape analysis completed: shape={result.body_shape}, confidence={result.confidence:.2f}, time={process_time:.2f}s")
-        return result.model_dump()
+        logger.info("Body shape analysis completed: shape=%s, confidence=%.2f, time=%.2fs", result.body_shape, result.confidence, process_time)
+        return result
     except Exception as e:
         process_time = time.time() - start_time
-        logger.error(f"Body shape analysis failed: {str(e)}, time={process_time:.2f}s", exc_info=True)
+        logger.error("Body shape analysis failed: %s, time=%.2fs", e, process_time, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing body shape: {str(e)}")
 
-@router.post("/test/analyze/body")
+@router.post("/test/analyze/body", response_model=BodyShapeResponse)
 async def test_upload_body_image(file: UploadFile = File(...)):
     """
     Test endpoint: Analyze body shape from uploaded image file.
@@ -95,23 +94,24 @@ async def test_upload_body_image(file: UploadFile = File(...)):
         
         # Validate image (body shape analysis doesn't require face, but validates size/format)
         try:
-            image, validation_result = validate_image_from_bytes(
+            image, validation_result = await run_in_threadpool(
+                validate_image_from_bytes,
                 contents,
                 require_face=False,
                 max_dimension=4096,
                 min_dimension=100
             )
-            logger.debug(f"Body image validated: {validation_result}")
+            logger.debug("Body image validated: %s", validation_result)
         except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
+            logger.warning("Image validation failed: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
         
-        result = get_your_body_shape(image)
+        result = await run_in_threadpool(get_your_body_shape, image)
         process_time = time.time() - start_time
-        logger.info(f"Body shape analysis completed: shape={result.body_shape}, confidence={result.confidence:.2f}, time={process_time:.2f}s")
+        logger.info("Body shape analysis completed: shape=%s, confidence=%.2f, time=%.2fs", result.body_shape, result.confidence, process_time)
         
-        return {"body_shape": result.body_shape, "confidence": result.confidence, "reasoning": result.reasoning}
+        return result
     except Exception as e:
         process_time = time.time() - start_time
-        logger.error(f"Body shape analysis failed: {str(e)}, time={process_time:.2f}s", exc_info=True)
+        logger.error("Body shape analysis failed: %s, time=%.2fs", e, process_time, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing body shape: {str(e)}")
\ No newline at end of file
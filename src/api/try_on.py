@@ -1,18 +1,23 @@
 """
 Try-on image generation API endpoints.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 from PIL import Image
 from io import BytesIO
-import base64
-from src.services import get_outfit_on as service_get_outfit_on, get_outfit_on_full_outfit as service_get_outfit_on_full_outfit
+import asyncio
+import orjson
+from src.services import aget_outfit_on as service_aget_outfit_on, get_outfit_on_full_outfit as service_get_outfit_on_full_outfit
 from src.services import get_outfit_on_full_outfit_on_sequential as service_get_outfit_on_sequential
 from src.models import GenerateOutfitOnRequest, GenerateOutfitOnFullOutfitRequest
+from src.utils.cache import TTLCache, content_key
+from src.utils.image_utils import decode_data_url, encode_base64_bytes
 from src.utils.logger import get_logger
 from src.utils.image_validator import (
-    validate_image_from_bytes,
-    validate_image_from_base64,
+    decode_and_validate,
+    decode_base64_image,
+    run_in_image_pool,
     ImageValidationError
 )
 import time
@@ -20,6 +25,179 @@ import time
 logger = get_logger("api.try_on")
 router = APIRouter(prefix="/api", tags=["try-on"])
 
+# Generated full-outfit PNGs by the content of their four inputs, so reloads
+# skip validation and generation; PNGs are large, so only a few are kept
+_full_outfit_results = TTLCache(maxsize=32, ttl=3600)
+
+# Content keys of input images that passed validation (with require_face), so
+# a selfie re-posted across try-on requests skips face detection. Only the
+# outcome is kept: images are decoded per request and never shared
+_validated_inputs = TTLCache(maxsize=256, ttl=600)
+
+# Gemini's image model generates at roughly 1K resolution; larger inputs only
+# add decode, face detection and upload time
+TRY_ON_MAX_DIMENSION = 1536
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    """
+    Encode an image as PNG with fast (level 1) zlib compression.
+    
+    BytesIO.getvalue() hands over the buffer's own bytes object without
+    copying, so a fresh buffer per call costs one growing allocation.
+    """
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=1, optimize=False)
+    return buffer.getvalue()
+
+
+async def _result_png(result: tuple[Image.Image, bytes | None]) -> bytes:
+    """
+    Return a try-on service result as PNG bytes.
+    
+    The model's own PNG is passed through as-is; only results without one
+    are encoded with _encode_png() in the threadpool.
+    """
+    image, png_bytes = result
+    if png_bytes is not None:
+        return png_bytes
+    return await run_in_threadpool(_encode_png, image)
+
+
+def _fit_for_try_on(image: Image.Image) -> Image.Image:
+    """Downscale an image in place to TRY_ON_MAX_DIMENSION on its long side."""
+    image.thumbnail((TRY_ON_MAX_DIMENSION, TRY_ON_MAX_DIMENSION), Image.Resampling.LANCZOS)
+    return image
+
+
+def _decode(data: bytes) -> Image.Image:
+    """Open and fully decode image bytes (Pillow releases the GIL while decoding)."""
+    image = Image.open(BytesIO(data))
+    image.load()
+    return _fit_for_try_on(image)
+
+
+def _decode_base64(payload: str) -> Image.Image:
+    """Decode a base64 string or data URL with _decode()."""
+    return _decode(decode_data_url(payload))
+
+
+async def _load_for_try_on(data: bytes, require_face: bool) -> Image.Image:
+    """
+    Validate an input image in the image pool, downscaled for the try-on model.
+    
+    Face detection is CPU-bound and holds the GIL, so it runs in the bounded
+    process pool instead of competing with the event loop's threads. Bytes
+    that already passed are only decoded (in the threadpool).
+    """
+    cache_key = (content_key(data), require_face)
+    if _validated_inputs.get(cache_key):
+        return await run_in_threadpool(_decode, data)
+    
+    image, validation_result = await run_in_image_pool(
+        decode_and_validate,
+        data,
+        require_face,
+        4096,  # max_dimension
+        100,   # min_dimension
+        TRY_ON_MAX_DIMENSION
+    )
+    logger.debug("Image validated: %s", validation_result)
+    _validated_inputs.set(cache_key, True)
+    return image
+
+
+async def _validate_upload(contents: bytes, label: str, require_face: bool = False) -> Image.Image:
+    """
+    Validate uploaded image bytes with _load_for_try_on().
+    
+    Raises:
+        HTTPException: 400 naming the image (label) if validation fails
+    """
+    try:
+        return await _load_for_try_on(contents, require_face)
+    except ImageValidationError as e:
+        logger.warning("%s image validation failed: %s", label, e)
+        raise HTTPException(status_code=400, detail=f"{label} image validation failed: {str(e)}")
+
+
+async def _validate_base64(payload: str, require_face: bool) -> Image.Image:
+    """
+    Decode and validate a base64 image with _load_for_try_on().
+    
+    The base64 is decoded here (pybase64 runs at GB/s), so the pool is sent
+    bytes a quarter smaller than the string.
+    """
+    data = await run_in_threadpool(decode_base64_image, payload)
+    return await _load_for_try_on(data, require_face)
+
+
+def _png_json_body(png: bytes, image_key: str, message: str) -> bytes:
+    """
+    Build a JSON try-on response body holding a PNG as a data URL.
+    
+    Base64 never needs JSON escaping, so the body is joined from bytes instead
+    of decoding the base64 to str and having the JSON encoder copy and scan it
+    again.
+    """
+    return b"".join((
+        b'{"', image_key.encode("ascii"), b'":"data:image/png;base64,', encode_base64_bytes(png),
+        b'","status":"success","message":', orjson.dumps(message), b"}"
+    ))
+
+
+def _try_on_key(*payloads: bytes | str) -> tuple[bytes, ...]:
+    """Content key of try-on inputs, as raw bytes or base64 strings."""
+    return tuple(
+        content_key(payload.encode("utf-8") if isinstance(payload, str) else payload)
+        for payload in payloads
+    )
+
+
+def _prefers_png(accept: str | None) -> bool:
+    """Check whether an Accept header ranks image/png above application/json."""
+    if not accept:
+        return False
+    quality: dict[str, float] = {}
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[media_type.strip().lower()] = q
+    return quality.get("image/png", 0.0) > quality.get("application/json", 0.0)
+
+
+async def _try_on_response(http_request: Request, png_bytes: bytes, image_key: str, message: str) -> Response:
+    """
+    Return a try-on PNG as-is if the client asks for it, else wrapped in JSON.
+    
+    Clients sending "Accept: image/png" skip base64 entirely; everyone else
+    gets the JSON body with image_key holding a PNG data URL.
+    """
+    headers = {"Vary": "Accept"}
+    if _prefers_png(http_request.headers.get("accept")):
+        return Response(content=png_bytes, media_type="image/png", headers=headers)
+    body = await run_in_threadpool(_png_json_body, png_bytes, image_key, message)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# OpenAPI docs for endpoints answering with JSON or, on request, raw PNG
+PNG_OR_JSON_RESPONSES = {
+    200: {
+        "content": {
+            "application/json": {},
+            "image/png": {"schema": {"type": "string", "format": "binary"}},
+        },
+        "description": "JSON with the try-on image as a PNG data URL, or raw PNG with Accept: image/png",
+    }
+}
+
 
 @router.post(
     "/test/try-on/generate",
@@ -47,43 +225,20 @@ async def download_try_on_image(
     logger.info("Test try-on generation request received (file upload)")
     
     try:
-        user_contents = await user_image.read()
-        # Validate user image (requires face for try-on)
-        try:
-            user_image_pil, user_validation = validate_image_from_bytes(
-                user_contents,
-                require_face=True,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"User image validated: {user_validation}")
-        except ImageValidationError as e:
-            logger.warning(f"User image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"User image validation failed: {str(e)}")
+        user_contents, product_contents = await asyncio.gather(user_image.read(), product_image.read())
+        # User image requires a face for try-on; the product image does not
+        user_image_pil, product_image_pil = await asyncio.gather(
+            _validate_upload(user_contents, "User", require_face=True),
+            _validate_upload(product_contents, "Product"),
+        )
         
-        product_contents = await product_image.read()
-        # Validate product image (no face required)
-        try:
-            product_image_pil, product_validation = validate_image_from_bytes(
-                product_contents,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            logger.debug(f"Product image validated: {product_validation}")
-        except ImageValidationError as e:
-            logger.warning(f"Product image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Product image validation failed: {str(e)}")
-        
-        result = service_get_outfit_on(user_image_pil, product_image_pil)
+        result = await service_aget_outfit_on(user_image_pil, product_image_pil)
         process_time = time.time() - start_time
         logger.info(f"Try-on image generated successfully, time={process_time:.2f}s")
 
-        buffer = BytesIO()
-        result.save(buffer, format="PNG")
-        buffer.seek(0)
+        png_bytes = await _result_png(result)
         headers = {"Content-Disposition": 'attachment; filename="try_on.png"'}
-        return StreamingResponse(buffer, media_type="image/png", headers=headers)
+        return Response(content=png_bytes, media_type="image/png", headers=headers)
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
@@ -100,70 +255,41 @@ async def download_try_on_full_outfit(
     logger.info("Test full outfit try-on generation request received (file upload)")
     
     try:
-        # Validate all images
-        user_contents = await user_image.read()
-        try:
-            user_image_pil, _ = validate_image_from_bytes(
-                user_contents,
-                require_face=True,
-                max_dimension=4096,
-                min_dimension=100
+        contents = await asyncio.gather(
+            user_image.read(), upper_image.read(), lower_image.read(), shoes_image.read()
+        )
+        cache_key = _try_on_key(*contents)
+        png_bytes = _full_outfit_results.get(cache_key)
+        if png_bytes is None:
+            # Validate all images concurrently
+            user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil = await asyncio.gather(
+                _validate_upload(contents[0], "User", require_face=True),
+                _validate_upload(contents[1], "Upper"),
+                _validate_upload(contents[2], "Lower"),
+                _validate_upload(contents[3], "Shoes"),
             )
-        except ImageValidationError as e:
-            raise HTTPException(status_code=400, detail=f"User image validation failed: {str(e)}")
-        
-        upper_contents = await upper_image.read()
-        try:
-            upper_image_pil, _ = validate_image_from_bytes(
-                upper_contents,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-        except ImageValidationError as e:
-            raise HTTPException(status_code=400, detail=f"Upper image validation failed: {str(e)}")
-        
-        lower_contents = await lower_image.read()
-        try:
-            lower_image_pil, _ = validate_image_from_bytes(
-                lower_contents,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-        except ImageValidationError as e:
-            raise HTTPException(status_code=400, detail=f"Lower image validation failed: {str(e)}")
-        
-        shoes_contents = await shoes_image.read()
-        try:
-            shoes_image_pil, _ = validate_image_from_bytes(
-                shoes_contents,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-        except ImageValidationError as e:
-            raise HTTPException(status_code=400, detail=f"Shoes image validation failed: {str(e)}")
-        
-        logger.debug("All outfit images validated successfully")
+            
+            logger.debug("All outfit images validated successfully")
 
-        result = service_get_outfit_on_full_outfit(user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil)
+            result = await run_in_threadpool(
+                service_get_outfit_on_full_outfit, user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil
+            )
+            png_bytes = await _result_png(result)
+            _full_outfit_results.set(cache_key, png_bytes)
         process_time = time.time() - start_time
         logger.info(f"Full outfit try-on image generated successfully, time={process_time:.2f}s")
 
-        buffer = BytesIO()
-        result.save(buffer, format="PNG")   
-        buffer.seek(0)
         headers = {"Content-Disposition": 'attachment; filename="full_outfit_try_on.png"'}
-        return StreamingResponse(buffer, media_type="image/png", headers=headers)
+        return Response(content=png_bytes, media_type="image/png", headers=headers)
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating full outfit try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating full outfit try-on image: {str(e)}")
 
-@router.post("/try-on/generate-full-outfit")
+@router.post("/try-on/generate-full-outfit", responses=PNG_OR_JSON_RESPONSES)
 async def get_outfit_on_full_outfit(
     request: GenerateOutfitOnFullOutfitRequest,
+    http_request: Request,
 ):
     """
     Generate full outfit try-on image from base64-encoded images.
@@ -180,55 +306,49 @@ async def get_outfit_on_full_outfit(
     logger.info("Full outfit try-on generation request received (base64)")
     
     try:
-        # Validate all images
-        try:
-            user_img, _ = validate_image_from_base64(
-                request.user_image,
-                require_face=True,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            upper_img, _ = validate_image_from_base64(
-                request.upper_image,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            lower_img, _ = validate_image_from_base64(
-                request.lower_image,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            shoes_img, _ = validate_image_from_base64(
-                request.shoes_image,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
-            )
-        except ImageValidationError as e:
-            logger.warning(f"Image validation failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        result = service_get_outfit_on_full_outfit(user_img, upper_img, lower_img, shoes_img)
+        cache_key = _try_on_key(request.user_image, request.upper_image, request.lower_image, request.shoes_image)
+        png_bytes = _full_outfit_results.get(cache_key)
+        if png_bytes is None:
+            # Validate all images concurrently
+            try:
+                user_img, upper_img, lower_img, shoes_img = await asyncio.gather(
+                    _validate_base64(request.user_image, require_face=True),
+                    _validate_base64(request.upper_image, require_face=False),
+                    _validate_base64(request.lower_image, require_face=False),
+                    _validate_base64(request.shoes_image, require_face=False),
+                )
+            except ImageValidationError as e:
+                logger.warning(f"Image validation failed: {str(e)}")
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            result = await run_in_threadpool(service_get_outfit_on_full_outfit, user_img, upper_img, lower_img, shoes_img)
+            png_bytes = await _result_png(result)
+            _full_outfit_results.set(cache_key, png_bytes)
         process_time = time.time() - start_time
         logger.info(f"Full outfit try-on image generated successfully, time={process_time:.2f}s")
         
-        buffer = BytesIO()
-        result.save(buffer, format="PNG")
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        return {
-            "try_on_full_outfit_image": f"data:image/png;base64,{image_base64}",
-            "status": "success",
-            "message": "Outfit try-on image generated successfully",
-        }
+        return await _try_on_response(
+            http_request, png_bytes, "try_on_full_outfit_image", "Outfit try-on image generated successfully"
+        )
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating full outfit try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating full outfit try-on image: {str(e)}")
 
-@router.post("/try-on/generate")
-def get_outfit_on(request: GenerateOutfitOnRequest):
+@router.post(
+    "/try-on/generate",
+    responses={
+        200: {
+            "content": {
+                "image/png": {
+                    "schema": {"type": "string", "format": "binary"}
+                }
+            },
+            "description": "Returns the generated try-on PNG image",
+        }
+    },
+)
+async def get_outfit_on(request: GenerateOutfitOnRequest):
     """
     Generate outfit try-on image from base64-encoded images.
     
@@ -239,7 +359,7 @@ def get_outfit_on(request: GenerateOutfitOnRequest):
     }
     
     Returns:
-        JSON response with base64-encoded try-on image
+        The try-on image as raw PNG bytes (no base64/JSON envelope)
     """
     start_time = time.time()
     logger.info("Try-on generation request received (base64)")
@@ -247,43 +367,29 @@ def get_outfit_on(request: GenerateOutfitOnRequest):
     try:
         # Validate images
         try:
-            user_img, _ = validate_image_from_base64(
-                request.user_image,
-                require_face=True,
-                max_dimension=4096,
-                min_dimension=100
-            )
-            product_img, _ = validate_image_from_base64(
-                request.product_image,
-                require_face=False,
-                max_dimension=4096,
-                min_dimension=100
+            user_img, product_img = await asyncio.gather(
+                _validate_base64(request.user_image, require_face=True),
+                _validate_base64(request.product_image, require_face=False),
             )
         except ImageValidationError as e:
             logger.warning(f"Image validation failed: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
         
-        result_image = service_get_outfit_on(user_img, product_img)
+        result = await service_aget_outfit_on(user_img, product_img)
         process_time = time.time() - start_time
         logger.info(f"Try-on image generated successfully, time={process_time:.2f}s")
 
-        buffer = BytesIO()
-        result_image.save(buffer, format="PNG")
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-        return {
-            "try_on_image": f"data:image/png;base64,{image_base64}",
-            "status": "success",
-            "message": "Outfit try-on image generated successfully",
-        }
+        png_bytes = await _result_png(result)
+        return Response(content=png_bytes, media_type="image/png")
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating try-on image: {str(e)}")
 
-@router.post("/try-on/generate-full-outfit/on-sequential")
+@router.post("/try-on/generate-full-outfit/on-sequential", responses=PNG_OR_JSON_RESPONSES)
 async def get_outfit_on_full_outfit_on_sequential(
     request: GenerateOutfitOnFullOutfitRequest,
+    http_request: Request,
 ):
     """
     Generate full outfit try-on image from base64-encoded images.
@@ -292,18 +398,19 @@ async def get_outfit_on_full_outfit_on_sequential(
     logger.info("Sequential full outfit try-on generation request received (base64)")
     
     try:
-        result = service_get_outfit_on_sequential(request.user_image, request.upper_image, request.lower_image, request.shoes_image)
+        # Decode all images concurrently instead of one by one inside the service
+        images = await asyncio.gather(*(
+            run_in_threadpool(_decode_base64, payload)
+            for payload in (request.user_image, request.upper_image, request.lower_image, request.shoes_image)
+        ))
+        result = await run_in_threadpool(service_get_outfit_on_sequential, *images)
         process_time = time.time() - start_time
         logger.info(f"Sequential full outfit try-on image generated successfully, time={process_time:.2f}s")
         
-        buffer = BytesIO()
-        result.save(buffer, format="PNG")
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        return {
-            "try_on_full_outfit_on_sequential_image": f"data:image/png;base64,{image_base64}",
-            "status": "success",
-            "message": "Outfit try-on on sequential image generated successfully",
-        }
+        png_bytes = await _result_png(result)
+        return await _try_on_response(
+            http_request, png_bytes, "try_on_full_outfit_on_sequential_image", "Outfit try-on on sequential image generated successfully"
+        )
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating sequential full outfit try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
@@ -324,25 +431,23 @@ async def get_outfit_on_full_outfit_on_sequential_test(
     
     try:
         # Convert UploadFile objects to PIL Images
-        contents = await user_image.read()
-        user_image_pil = Image.open(BytesIO(contents))
-        contents = await upper_image.read()
-        upper_image_pil = Image.open(BytesIO(contents))
-        contents = await lower_image.read()
-        lower_image_pil = Image.open(BytesIO(contents))
-        contents = await shoes_image.read()
-        shoes_image_pil = Image.open(BytesIO(contents))
+        contents = await asyncio.gather(
+            user_image.read(), upper_image.read(), lower_image.read(), shoes_image.read()
+        )
+        user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil = await asyncio.gather(
+            *(run_in_threadpool(_decode, data) for data in contents)
+        )
         logger.debug("All outfit images loaded successfully for sequential processing")
         
-        result = service_get_outfit_on_sequential(user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil)
+        result = await run_in_threadpool(
+            service_get_outfit_on_sequential, user_image_pil, upper_image_pil, lower_image_pil, shoes_image_pil
+        )
         process_time = time.time() - start_time
         logger.info(f"Sequential full outfit try-on image generated successfully, time={process_time:.2f}s")
         
-        buffer = BytesIO()
-        result.save(buffer, format="PNG")   
-        buffer.seek(0)
+        png_bytes = await _result_png(result)
         headers = {"Content-Disposition": 'attachment; filename="full_outfit_try_on_sequential.png"'}
-        return StreamingResponse(buffer, media_type="image/png", headers=headers)
+        return Response(content=png_bytes, media_type="image/png", headers=headers)
     except Exception as e:
         process_time = time.time() - start_time
         logger.error(f"Error generating sequential full outfit try-on image: {str(e)}, time={process_time:.2f}s", exc_info=True)
@@ -2,10 +2,12 @@
 User personal color results API endpoints.
 """
 from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Optional
-from src.database.user_db import get_db, User, UserColorResult
-from src.utils.auth import get_current_user
+from src.database.user_db import get_db, UserColorResult
+from src.utils.auth import CurrentUser, get_current_user
 from src.models import (
     SaveColorResultRequest,
     ColorResultResponse
@@ -15,11 +17,36 @@ from src.utils.logger import get_logger
 logger = get_logger("api.user_color")
 router = APIRouter(prefix="/api/user/color", tags=["user-color"])
 
+# Only the columns ColorResultResponse needs, so listings skip ORM hydration
+_RESULT_COLUMNS = (
+    UserColorResult.id,
+    UserColorResult.personal_color_type,
+    UserColorResult.confidence,
+    UserColorResult.undertone,
+    UserColorResult.season,
+    UserColorResult.subtype,
+    UserColorResult.reasoning,
+    UserColorResult.created_at,
+)
+
+# Cap on results returned when no limit is given
+DEFAULT_RESULTS_LIMIT = 1000
+
+# Newest first, ties broken by id so (created_at, id) keyset pages are stable.
+# Matches ix_user_color_results_user_created_id read backwards, so no sort
+_NEWEST_FIRST = (UserColorResult.created_at.desc(), UserColorResult.id.desc())
+
+
+def _older_than(cursor: datetime, cursor_id: int):
+    """Filter for results after (cursor, cursor_id) in _NEWEST_FIRST order."""
+    # Row-value comparison, so the index range starts right at the cursor
+    return tuple_(UserColorResult.created_at, UserColorResult.id) < tuple_(cursor, cursor_id)
+
 
 @router.post("/save", response_model=ColorResultResponse, status_code=status.HTTP_201_CREATED)
 def save_color_result(
     request: SaveColorResultRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -73,47 +100,53 @@ def save_color_result(
 
 @router.get("/results", response_model=List[ColorResultResponse])
 def get_color_results(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    cursor: Optional[datetime] = None,
+    cursor_id: Optional[int] = None
 ):
     """
-    Get all personal color analysis results for the current user.
+    Get the personal color analysis results for the current user, most recent first.
+    
+    Returns at most 1000 results (DEFAULT_RESULTS_LIMIT) when no limit is
+    given. Pages are keyed by position rather than offset: pass the
+    created_at and id of the last result received as cursor and cursor_id
+    to get the results after it.
     
     Args:
         current_user: Current authenticated user
         db: Database session
-        limit: Optional limit on number of results to return (most recent first)
+        limit: Optional limit on number of results to return,
+            DEFAULT_RESULTS_LIMIT if not given
+        cursor: created_at of the last result of the previous page
+        cursor_id: id of the last result of the previous page
     
     Returns:
         List of color analysis results
     """
-    logger.info(f"Get color results request for user_id={current_user.id}, limit={limit}")
+    logger.info(
+        f"Get color results request for user_id={current_user.id}, limit={limit}, "
+        f"cursor={cursor}, cursor_id={cursor_id}"
+    )
+    if (cursor is None) != (cursor_id is None):
+        raise HTTPException(
+            status_code=422,
+            detail="cursor and cursor_id must be given together"
+        )
     
     try:
-        query = db.query(UserColorResult).filter(
+        query = db.query(*_RESULT_COLUMNS).filter(
             UserColorResult.user_id == current_user.id
-        ).order_by(UserColorResult.created_at.desc())
-        
-        if limit:
-            query = query.limit(limit)
+        )
+        if cursor is not None:
+            query = query.filter(_older_than(cursor, cursor_id))
         
-        results = query.all()
-        logger.info(f"Found {len(results)} color results for user_id={current_user.id}")
+        rows = query.order_by(*_NEWEST_FIRST).limit(limit or DEFAULT_RESULTS_LIMIT).all()
+        logger.info(f"Found {len(rows)} color results for user_id={current_user.id}")
         
-        return [
-            ColorResultResponse(
-                id=result.id,
-                personal_color_type=result.personal_color_type,
-                confidence=result.confidence,
-                undertone=result.undertone,
-                season=result.season,
-                subtype=result.subtype,
-                reasoning=result.reasoning,
-                created_at=result.created_at
-            )
-            for result in results
-        ]
+        # Rows come from our own table, so skip per-row validation
+        return [ColorResultResponse.model_construct(**row._mapping) for row in rows]
     except Exception as e:
         logger.error(f"Error getting color results for user_id={current_user.id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -124,7 +157,7 @@ def get_color_results(
 
 @router.get("/latest", response_model=ColorResultResponse)
 def get_latest_color_result(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -142,7 +175,7 @@ def get_latest_color_result(
     try:
         result = db.query(UserColorResult).filter(
             UserColorResult.user_id == current_user.id
-        ).order_by(UserColorResult.created_at.desc()).first()
+        ).order_by(*_NEWEST_FIRST).first()
         
         if not result:
             logger.warning(f"No color results found for user_id={current_user.id}")
@@ -176,7 +209,7 @@ def get_latest_color_result(
 @router.delete("/results/{result_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_color_result(
     result_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
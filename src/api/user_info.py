@@ -6,9 +6,9 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from src.database.user_db import get_db, User, UserProfile
+from src.database.user_db import get_db, UserProfile
 from src.models import UpdateUserProfileRequest, UserProfileResponse
-from src.utils.auth import get_current_user
+from src.utils.auth import CurrentUser, get_current_user
 from src.utils.logger import get_logger
 
 logger = get_logger("api.user_info")
@@ -36,7 +36,7 @@ def normalize_base64_image(base64_image: str) -> str:
 
 @router.get("/profile", response_model=UserProfileResponse)
 async def get_user_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -70,7 +70,7 @@ async def get_user_profile(
 @router.post("/profile", response_model=UserProfileResponse, status_code=status.HTTP_201_CREATED)
 async def create_or_update_user_profile(
     profile_data: UpdateUserProfileRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -127,7 +127,7 @@ async def create_or_update_user_profile(
 @router.put("/profile", response_model=UserProfileResponse)
 async def update_user_profile(
     profile_data: UpdateUserProfileRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -139,7 +139,7 @@ async def update_user_profile(
 
 @router.delete("/profile", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -175,7 +175,7 @@ async def delete_user_profile(
 
 @router.get("/profile/completeness")
 async def get_profile_completeness(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -4,8 +4,8 @@ User liked outfits API endpoints.
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 from typing import List
-from src.database.user_db import get_db, User, UserLikedOutfit
-from src.utils.auth import get_current_user
+from src.database.user_db import get_db, UserLikedOutfit
+from src.utils.auth import CurrentUser, get_current_user
 from src.database.db import get_outfits_by_ids
 from src.models import (
     LikeOutfitRequest,
@@ -21,7 +21,7 @@ router = APIRouter(prefix="/api/user/outfits", tags=["user-outfits"])
 @router.post("/like", response_model=LikedOutfitResponse, status_code=status.HTTP_201_CREATED)
 def like_outfit(
     request: LikeOutfitRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -82,7 +82,7 @@ def like_outfit(
 @router.delete("/like/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def unlike_outfit(
     item_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -125,7 +125,7 @@ def unlike_outfit(
 
 @router.get("/liked", response_model=List[LikedOutfitWithDetailsResponse])
 def get_liked_outfits(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -189,7 +189,7 @@ def get_liked_outfits(
 @router.get("/liked/{item_id}")
 def check_if_liked(
     item_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
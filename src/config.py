@@ -1,11 +1,26 @@
 import os
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient as AnthropicHttpxClient
 from google import genai
+from google.genai import types
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient as OpenAIHttpxClient
 from dotenv import load_dotenv
 
 import src.prompts as prompts
 
 load_dotenv()
 
+# Connection pool for the Gemini client: HTTP/2 with keepalive so calls reuse
+# warm TLS connections instead of handshaking on cold paths. The OpenAI and
+# Anthropic SDKs bundle their own httpx, so they get HTTP/2 through their
+# DefaultAsyncHttpxClient (which keeps the SDK's pool limits) and share the timeout.
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "120"))  # seconds; image generation can be slow
+LLM_HTTP_CLIENT_ARGS = {
+    "http2": True,
+    "limits": httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60.0),
+    "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT, connect=5.0),
+}
+
 
 class Config:
     NANO_BANANA_PROMPT = prompts.NANO_BANANA_PROMPT
@@ -14,14 +29,50 @@ class Config:
     FULL_OUTFIT_PROMPT = prompts.FULL_OUTFIT_PROMPT
 
     def __init__(self):
-        self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.client = genai.Client(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_options=types.HttpOptions(
+                # genai passes its own per-request timeout (ms), overriding the client's
+                timeout=int(LLM_HTTP_TIMEOUT * 1000),
+                httpx_client=httpx.Client(**LLM_HTTP_CLIENT_ARGS),
+                httpx_async_client=httpx.AsyncClient(**LLM_HTTP_CLIENT_ARGS),
+            ),
+        )
         self._openai_key = os.getenv("OPENAI_API_KEY")
         self._anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         self._database_url = os.getenv("DATABASE_URL")
+        self._openai_client = None
+        self._anthropic_client = None
 
     def get_client(self):
         return self.client
     
+    def get_openai_client(self):
+        """Shared AsyncOpenAI client; one connection pool for all requests in this process."""
+        if self._openai_client is None:
+            self._openai_client = AsyncOpenAI(
+                api_key=self.get_openai_key(),
+                timeout=LLM_HTTP_TIMEOUT,
+                http_client=OpenAIHttpxClient(http2=True),
+            )
+        return self._openai_client
+    
+    def get_anthropic_client(self):
+        """Shared AsyncAnthropic client; one connection pool for all requests in this process."""
+        if self._anthropic_client is None:
+            self._anthropic_client = AsyncAnthropic(
+                api_key=self.get_anthropic_key(),
+                timeout=LLM_HTTP_TIMEOUT,
+                http_client=AnthropicHttpxClient(http2=True),
+            )
+        return self._anthropic_client
+    
+    async def aclose(self):
+        """Close the OpenAI/Anthropic connection pools (call on shutdown)."""
+        for client in (self._openai_client, self._anthropic_client):
+            if client is not None:
+                await client.close()
+    
     def get_openai_key(self):
         if not self._openai_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
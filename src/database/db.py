@@ -47,6 +47,50 @@ def __get_all_items() -> list[dict]:
     return __get_all_items_cached(cache_time)
 
 
+@lru_cache(maxsize=256)
+def _get_outfits_cached(season: str | None, category: str | None, cache_time: int) -> tuple[dict, ...]:
+    """
+    Fetch outfits matching optional season/category filters, cached per TTL period.
+    
+    Args:
+        season: Personal color type, or None for any
+        category: Product category, or None for any
+        cache_time: Current cache period (used to invalidate cache after TTL)
+    
+    Returns:
+        Tuple of item dictionaries (shared between callers, do not mutate)
+    """
+    db = _get_db_session()
+    try:
+        query = db.query(Product)
+        
+        if season is not None:
+            query = query.filter(Product.personal_color_type == season)
+        if category is not None:
+            query = query.filter(Product.type == category)
+        
+        return tuple(_product_to_dict(product) for product in query.all())
+    finally:
+        db.close()
+
+
+def _get_outfits(season: str | None, category: str | None) -> list[dict]:
+    """
+    Get filtered outfits with automatic time-based cache invalidation.
+    Cache refreshes every CACHE_TTL seconds.
+    """
+    cache_time = int(time() // CACHE_TTL)
+    return list(_get_outfits_cached(season, category, cache_time))
+
+
+def clear_outfit_cache() -> None:
+    """
+    Drop cached outfit queries, e.g. after products were migrated.
+    """
+    __get_all_items_cached.cache_clear()
+    _get_outfits_cached.cache_clear()
+
+
 def _product_to_dict(product: Product) -> dict:
     """
     Convert Product model to dictionary format matching the original Google Sheets structure.
@@ -77,14 +121,7 @@ def get_outfit_by_season(season: str) -> list[dict]:
     Returns:
         List of outfit items matching the season
     """
-    db = _get_db_session()
-    try:
-        products = db.query(Product).filter(
-            Product.personal_color_type == season
-        ).all()
-        return [_product_to_dict(product) for product in products]
-    finally:
-        db.close()
+    return _get_outfits(season, None)
 
 
 def get_outfit_by_category(category: str) -> list[dict]:
@@ -97,17 +134,16 @@ def get_outfit_by_category(category: str) -> list[dict]:
     Returns:
         List of outfit items matching the category
     """
-    db = _get_db_session()
-    try:
-        products = db.query(Product).filter(
-            Product.type == category
-        ).all()
-        return [_product_to_dict(product) for product in products]
-    finally:
-        db.close()
+    return _get_outfits(None, category)
 
 
-def get_outfit_by_season_and_category(season: str, category: str, sort_by_popularity: bool = True) -> list[dict]:
+def get_outfit_by_season_and_category(
+    season: str,
+    category: str,
+    sort_by_popularity: bool = True,
+    limit: int | None = None,
+    offset: int = 0
+) -> list[dict]:
     """
     Get outfits filtered by both season and category, sorted by popularity.
     
@@ -115,29 +151,22 @@ def get_outfit_by_season_and_category(season: str, category: str, sort_by_popula
         season: Personal color type
         category: Product category
         sort_by_popularity: If True, sort by popularity (most popular first)
+        limit: Maximum number of items to return (None for all)
+        offset: Number of items to skip, applied after sorting
     
     Returns:
         List of outfit items matching both filters, sorted by popularity
     """
-    db = _get_db_session()
-    try:
-        query = db.query(Product)
-        
-        if season is not None:
-            query = query.filter(Product.personal_color_type == season)
-        if category is not None:
-            query = query.filter(Product.type == category)
-        
-        products = query.all()
-        items = [_product_to_dict(product) for product in products]
-        
-        # Sort by popularity if requested
-        if sort_by_popularity:
-            items = add_popularity_to_items(items)
-        
-        return items
-    finally:
-        db.close()
+    items = _get_outfits(season, category)
+    
+    # Sort by popularity if requested (likes change often, so not cached here)
+    if sort_by_popularity:
+        items = add_popularity_to_items(items)
+    
+    if offset or limit is not None:
+        items = items[offset:None if limit is None else offset + limit]
+    
+    return items
 
 
 def get_outfit_by_id(item_id: str) -> dict | None:
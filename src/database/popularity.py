@@ -91,18 +91,21 @@ def add_popularity_to_items(items: list[dict]) -> list[dict]:
         items: List of item dictionaries
     
     Returns:
-        List of items with 'popularity' field added, sorted by popularity (highest first)
+        New list of item copies with 'popularity' field added, sorted by
+        popularity (highest first). Input dicts are not modified, so cached
+        items can be passed in.
     """
     popularity = get_all_popularity()
     
-    # Add popularity to each item
-    for item in items:
-        item_id = str(item.get("ID", ""))
-        item["popularity"] = popularity.get(item_id, 0)
+    # Add popularity to a copy of each item
+    items_with_popularity = [
+        {**item, "popularity": popularity.get(str(item.get("ID", "")), 0)}
+        for item in items
+    ]
     
     # Sort by popularity (descending), then by ID for consistency
     sorted_items = sorted(
-        items,
+        items_with_popularity,
         key=lambda x: (x.get("popularity", 0), x.get("ID", 0)),
         reverse=True
     )
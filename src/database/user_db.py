@@ -2,7 +2,7 @@
 User database models and session management.
 """
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Float, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from pathlib import Path
@@ -24,14 +24,27 @@ if DATABASE_URL:
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     logger.info("Using PostgreSQL database from DATABASE_URL")
-    # PostgreSQL connection args
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=5, max_overflow=10)
+    # PostgreSQL connection pool sized for the threadpool-backed DB endpoints;
+    # connections are recycled before server-side idle timeouts drop them.
+    # Sizes are per worker process, so keep workers * (size + overflow) under
+    # the server's max_connections.
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "25")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "25")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=1800,
+    )
 else:
     # SQLite database (fallback for local development)
     DB_PATH = Path("data/users.db")
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     DATABASE_URL = f"sqlite:///{DB_PATH}"
     logger.info(f"Using SQLite database at {DB_PATH}")
+    # SQLAlchemy 2.x already pools file-based SQLite connections (QueuePool).
+    # StaticPool is avoided: one connection shared across threadpool workers
+    # is not safe for concurrent use.
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
 # Create session factory
@@ -73,16 +86,23 @@ class UserLikedOutfit(Base):
 class UserColorResult(Base):
     """User's personal color analysis results."""
     __tablename__ = "user_color_results"
+    # Every read filters by user and orders by newest first (id breaking ties);
+    # one composite index serves both, so /latest is a seek and /results a
+    # range scan. It also covers user_id lookups, so that column has no index
+    __table_args__ = (
+        Index("ix_user_color_results_user_created_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     personal_color_type = Column(String, nullable=False)
     confidence = Column(Float, nullable=False)
     undertone = Column(String)
     season = Column(String)
     subtype = Column(String)
     reasoning = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # NOT NULL so newest-first order and keyset paging stay on the index
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationship
     user = relationship("User", back_populates="color_results")
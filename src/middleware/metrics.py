@@ -4,9 +4,8 @@ Metrics middleware for tracking response time and success rate.
 from fastapi import Request, status
 from typing import Callable
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
-import threading
 
 from src.utils.logger import get_logger
 
@@ -15,18 +14,23 @@ logger = get_logger("middleware.metrics")
 
 class MetricsCollector:
     """
-    Thread-safe metrics collector for API endpoints.
+    Lock-free metrics collector for API endpoints.
     Tracks response times and success rates per endpoint.
+    
+    Samples live in bounded deques, so recording is a single append with no
+    shared lock; percentiles are computed from a snapshot at read time.
+    Recording happens in the middleware on the event loop thread.
     """
     
-    def __init__(self):
-        self._lock = threading.Lock()
-        self._response_times = defaultdict(list)  # {endpoint: [times]}
+    def __init__(self, max_samples: int = 10000):
+        self._max_samples = max_samples  # Max samples per endpoint
+        self._response_times: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=self._max_samples)
+        )  # {endpoint: recent times}
         self._request_counts = defaultdict(int)  # {endpoint: count}
         self._success_counts = defaultdict(int)  # {endpoint: success_count}
         self._error_counts = defaultdict(int)  # {endpoint: error_count}
         self._window_size = 3600  # 1 hour window
-        self._max_samples = 1000  # Max samples per endpoint
     
     def record_request(
         self,
@@ -42,23 +46,17 @@ class MetricsCollector:
             response_time: Response time in seconds
             status_code: HTTP status code
         """
-        with self._lock:
-            # Record response time
-            times = self._response_times[endpoint]
-            times.append(response_time)
-            
-            # Keep only recent samples
-            if len(times) > self._max_samples:
-                times.pop(0)
-            
-            # Record counts
-            self._request_counts[endpoint] += 1
-            
-            # Record success/error
-            if 200 <= status_code < 400:
-                self._success_counts[endpoint] += 1
-            else:
-                self._error_counts[endpoint] += 1
+        # Bounded deque drops the oldest sample on overflow
+        self._response_times[endpoint].append(response_time)
+        
+        # Record counts
+        self._request_counts[endpoint] += 1
+        
+        # Record success/error
+        if 200 <= status_code < 400:
+            self._success_counts[endpoint] += 1
+        else:
+            self._error_counts[endpoint] += 1
     
     def get_metrics(self, endpoint: str | None = None) -> dict:
         """
@@ -70,15 +68,15 @@ class MetricsCollector:
         Returns:
             Dictionary with metrics
         """
-        with self._lock:
-            if endpoint:
-                return self._get_endpoint_metrics(endpoint)
-            else:
-                return self._get_all_metrics()
+        if endpoint:
+            return self._get_endpoint_metrics(endpoint)
+        else:
+            return self._get_all_metrics()
     
     def _get_endpoint_metrics(self, endpoint: str) -> dict:
         """Get metrics for a specific endpoint."""
-        times = self._response_times.get(endpoint, [])
+        # Snapshot so concurrent appends don't affect this read
+        times = list(self._response_times.get(endpoint, ()))
         request_count = self._request_counts.get(endpoint, 0)
         success_count = self._success_counts.get(endpoint, 0)
         error_count = self._error_counts.get(endpoint, 0)
@@ -117,7 +115,7 @@ class MetricsCollector:
     
     def _get_all_metrics(self) -> dict:
         """Get metrics for all endpoints."""
-        all_endpoints = set(self._request_counts.keys())
+        all_endpoints = list(self._request_counts)
         
         return {
             "endpoints": {
@@ -137,11 +135,14 @@ class MetricsCollector:
     
     def reset(self):
         """Reset all metrics."""
-        with self._lock:
-            self._response_times.clear()
-            self._request_counts.clear()
-            self._success_counts.clear()
-            self._error_counts.clear()
+        self._response_times.clear()
+        self._request_counts.clear()
+        self._success_counts.clear()
+        self._error_counts.clear()
+
+
+# Health checks, metric scrapes and docs are not recorded
+SKIP_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/openapi.json", "/redoc"})
 
 
 # Global metrics collector instance
@@ -155,15 +156,15 @@ async def metrics_middleware(request: Request, call_next: Callable):
     This middleware should be added after rate limiting but before request logging.
     """
     # Skip metrics for health check and docs
-    if request.url.path in ["/", "/docs", "/openapi.json", "/redoc", "/metrics"]:
+    if request.url.path in SKIP_PATHS:
         return await call_next(request)
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     endpoint = request.url.path
     
     try:
         response = await call_next(request)
-        response_time = time.time() - start_time
+        response_time = (time.perf_counter_ns() - start_ns) / 1e9
         status_code = response.status_code
         
         # Record metrics
@@ -174,7 +175,7 @@ async def metrics_middleware(request: Request, call_next: Callable):
         
         return response
     except Exception as e:
-        response_time = time.time() - start_time
+        response_time = (time.perf_counter_ns() - start_ns) / 1e9
         status_code = 500
         
         # Record metrics for error
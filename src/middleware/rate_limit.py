@@ -4,12 +4,23 @@ Rate limiting middleware for FastAPI.
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from typing import Callable
+import os
 import time
+import uuid
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 from src.utils.logger import get_logger
 
 logger = get_logger("middleware.rate_limit")
 
+# Health checks, metric scrapes and docs bypass rate limiting
+SKIP_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/openapi.json", "/redoc"})
+
 
 def get_remote_address(request: Request) -> str:
     """
@@ -54,8 +65,8 @@ def create_rate_limit_middleware(
         """
         Rate limiting middleware that applies different limits based on endpoint path.
         """
-        # Skip rate limiting for health check and docs
-        if request.url.path in ["/", "/docs", "/openapi.json", "/redoc"]:
+        # Skip rate limiting for health check, metrics and docs
+        if request.url.path in SKIP_PATHS:
             return await call_next(request)
         
         # Determine rate limit based on endpoint
@@ -94,11 +105,11 @@ def create_rate_limit_middleware(
 
 
 # Simple in-memory rate limiter (for development)
-# For production, use Redis-based rate limiting
+# For production, set REDIS_URL to use RedisRateLimiter
 class SimpleRateLimiter:
     """
     Simple in-memory rate limiter.
-    For production, use Redis-based solution.
+    For production, use RedisRateLimiter so limits are shared across workers.
     """
     
     def __init__(self):
@@ -199,18 +210,105 @@ class SimpleRateLimiter:
         # Add current request
         self.requests[client_ip].append((current_time, endpoint))
         return True, 0
+    
+    async def check(
+        self,
+        client_ip: str,
+        endpoint: str,
+        rate_limit: str = "100/minute"
+    ) -> tuple[bool, int]:
+        """Async interface shared with RedisRateLimiter."""
+        return self.is_allowed(client_ip, endpoint, rate_limit)
+
+
+# Sliding window over a sorted set: drop expired entries, then either reject
+# with a retry-after or record this request. Runs atomically inside Redis.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {0, math.floor(window - (now - tonumber(oldest[2]))) + 1}
+end
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('EXPIRE', key, window)
+return {1, 0}
+"""
+
+
+class RedisRateLimiter(SimpleRateLimiter):
+    """
+    Redis-backed sliding window rate limiter shared by all workers.
+    
+    Each check is a single EVALSHA of SLIDING_WINDOW_SCRIPT. If Redis is
+    unreachable, falls back to the in-memory limiter of this process.
+    """
+    
+    def __init__(self, redis_url: str, key_prefix: str = "ratelimit"):
+        super().__init__()
+        self._redis = aioredis.from_url(redis_url)
+        # register_script caches the SHA and reloads it on NOSCRIPT
+        self._script = self._redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._key_prefix = key_prefix
+    
+    async def check(
+        self,
+        client_ip: str,
+        endpoint: str,
+        rate_limit: str = "100/minute"
+    ) -> tuple[bool, int]:
+        """
+        Check if request is allowed based on rate limit.
+        
+        Args:
+            client_ip: Client IP address
+            endpoint: Endpoint path
+            rate_limit: Rate limit string (e.g., "10/minute")
+        
+        Returns:
+            Tuple of (is_allowed, retry_after_seconds)
+        """
+        max_requests, window_seconds = self._parse_rate_limit(rate_limit)
+        key = f"{self._key_prefix}:{client_ip}:{endpoint}"
+        
+        try:
+            allowed, retry_after = await self._script(
+                keys=[key],
+                args=[time.time(), window_seconds, max_requests, uuid.uuid4().hex]
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limit check failed, using in-memory limiter: {str(e)}")
+            return self.is_allowed(client_ip, endpoint, rate_limit)
+        
+        return bool(allowed), int(retry_after)
+
+
+def _create_rate_limiter() -> SimpleRateLimiter:
+    """
+    Use the Redis limiter when REDIS_URL is set, otherwise the in-memory one.
+    """
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        if REDIS_AVAILABLE:
+            logger.info("Using Redis-backed rate limiter")
+            return RedisRateLimiter(redis_url)
+        logger.warning("REDIS_URL is set but redis is not installed, using in-memory rate limiter")
+    return SimpleRateLimiter()
 
 
 # Global rate limiter instance
-_rate_limiter = SimpleRateLimiter()
+_rate_limiter = _create_rate_limiter()
 
 
 async def rate_limit_middleware(request: Request, call_next: Callable):
     """
     Rate limiting middleware that applies different limits based on endpoint path.
     """
-    # Skip rate limiting for health check and docs
-    if request.url.path in ["/", "/docs", "/openapi.json", "/redoc"]:
+    # Skip rate limiting for health check, metrics and docs
+    if request.url.path in SKIP_PATHS:
         return await call_next(request)
     
     # Get client IP
@@ -231,7 +329,7 @@ async def rate_limit_middleware(request: Request, call_next: Callable):
         limit = "100/minute"
     
     # Check rate limit
-    is_allowed, retry_after = _rate_limiter.is_allowed(client_ip, endpoint_path, limit)
+    is_allowed, retry_after = await _rate_limiter.check(client_ip, endpoint_path, limit)
     
     if not is_allowed:
         logger.warning(
@@ -25,6 +25,27 @@ class AnalyzeColorSeasonResponseModel(BaseModel):
     )
 
 
+class FaceShapeResponse(BaseModel):
+    """Response model for face shape analysis."""
+    face_shape: str = Field(description="The face shape of the person (e.g., oval, round, square)")
+    confidence: float = Field(description="The confidence of the face shape")
+    reasoning: str = Field(default="", description="The reasoning for the face shape")
+
+
+class BodyShapeResponse(BaseModel):
+    """Response model for body shape analysis."""
+    body_shape: str = Field(description="The body shape of the person (e.g., hourglass, rectangle, pear)")
+    confidence: float = Field(description="The confidence of the body shape")
+    reasoning: str = Field(default="", description="The reasoning for the body shape")
+
+
+class ColorPaletteResponse(BaseModel):
+    """Response model for a season's color palette."""
+    season: str = Field(description="The matched personal color season")
+    palette: dict[str, list[str]] = Field(description="Primary, secondary and accent colors in HEX format")
+    note: str | None = Field(None, description="How a partial season name was matched")
+
+
 class AnalyzeColorSeasonRequest(BaseModel):
     image: str = Field(description="The image to analyze")
 
@@ -3,18 +3,22 @@ Services package - business logic layer.
 """
 from src.services.stylist import (
     get_your_color_season,
+    aget_your_color_season,
     get_your_color_season_ensemble_parallel,
     get_your_color_season_ensemble_hybrid,
     get_outfit_on,
+    aget_outfit_on,
     get_outfit_on_full_outfit,
     get_outfit_on_full_outfit_on_sequential,
 )
 
 __all__ = [
     "get_your_color_season",
+    "aget_your_color_season",
     "get_your_color_season_ensemble_parallel",
     "get_your_color_season_ensemble_hybrid",
     "get_outfit_on",
+    "aget_outfit_on",
     "get_outfit_on_full_outfit",
     "get_outfit_on_full_outfit_on_sequential",
 ]
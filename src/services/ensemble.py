@@ -3,19 +3,26 @@ Ensemble service for multi-model color analysis.
 Implements parallel processing with aggregation and hybrid judge approach.
 """
 import json
+import os
 import asyncio
 from typing import List, Dict, Optional, Literal
 from PIL import Image
-from io import BytesIO
-import base64
 
 from google.genai import types as gemini_types
-from openai import OpenAI
-from anthropic import Anthropic
 
 from src.config import config
 from src.models import AnalyzeColorSeasonResponseModel
-from src.utils.image_utils import base64_to_image
+from src.utils.image_utils import PreparedImage, base64_to_image, prepare_image
+from src.utils.llm_json import parse_llm_json
+from src.utils.logger import get_logger
+
+logger = get_logger("services.ensemble")
+
+# Caps on in-flight work per worker process: whole ensemble requests, and
+# calls to each provider (ensemble analyses and judge calls combined), so
+# bursts queue here instead of piling up as provider-side rate limiting
+ENSEMBLE_MAX_CONCURRENCY = int(os.getenv("ENSEMBLE_MAX_CONCURRENCY", "32"))
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "32"))
 
 
 class EnsembleColorAnalyzer:
@@ -29,51 +36,55 @@ class EnsembleColorAnalyzer:
     
     def __init__(self):
         self.gemini_client = config.get_client()
-        self.openai_client = OpenAI(api_key=config.get_openai_key())
-        self.anthropic_client = Anthropic(api_key=config.get_anthropic_key())
-        
-    def _image_to_base64(self, image: Image.Image) -> str:
-        """Convert PIL Image to base64 string."""
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        return img_str
+        self.openai_client = config.get_openai_client()
+        self.anthropic_client = config.get_anthropic_client()
+        self._analyzers = {
+            "gemini": self._analyze_with_gemini,
+            "openai": self._analyze_with_openai,
+            "claude": self._analyze_with_claude,
+        }
+        self._ensemble_limit = asyncio.Semaphore(ENSEMBLE_MAX_CONCURRENCY)
+        self._provider_limits = {
+            model: asyncio.Semaphore(PROVIDER_MAX_CONCURRENCY) for model in self._analyzers
+        }
     
-    def _prepare_image(self, image_input: str | Image.Image) -> Image.Image:
-        """Convert input to PIL Image."""
+    async def _prepare_image(self, image_input: str | Image.Image | PreparedImage) -> PreparedImage:
+        """
+        Decode (if needed), downscale and JPEG-encode an image once for all providers.
+        
+        Already prepared images (e.g. cached by the API layer) are used as-is.
+        """
+        if isinstance(image_input, PreparedImage):
+            return image_input
+        return await asyncio.to_thread(self._encode_image, image_input)
+    
+    def _encode_image(self, image_input: str | Image.Image) -> PreparedImage:
+        """Decode (if needed) and prepare an image (CPU-bound)."""
         if isinstance(image_input, str):
-            return base64_to_image(image_input)
-        return image_input
+            image_input = base64_to_image(image_input)
+        return prepare_image(image_input)
     
     async def _analyze_with_gemini(
         self, 
-        image: Image.Image,
+        image: PreparedImage,
         model: str = "gemini-2.5-flash"
     ) -> AnalyzeColorSeasonResponseModel:
         """Analyze color with Gemini."""
         try:
-            # Run synchronous call in thread pool
-            response = await asyncio.to_thread(
-                self.gemini_client.models.generate_content,
+            response = await self.gemini_client.aio.models.generate_content(
                 model=model,
                 config=gemini_types.GenerateContentConfig(
                     system_instruction=config.SYSTEM_PROMPT,
                     response_mime_type="application/json",
                 ),
-                contents=[image, config.JSON_PROMPT],
+                contents=[
+                    gemini_types.Part.from_bytes(data=image.data, mime_type=image.mime_type),
+                    config.JSON_PROMPT
+                ],
             )
             
             response_text = response.text.strip()
-            # Clean JSON response
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            data = json.loads(response_text)
+            data = parse_llm_json(response_text)
             defaults = {
                 "undertone": "unknown",
                 "season": "unknown",
@@ -90,20 +101,15 @@ class EnsembleColorAnalyzer:
     
     async def _analyze_with_openai(
         self, 
-        image: Image.Image
+        image: PreparedImage
     ) -> AnalyzeColorSeasonResponseModel:
         """Analyze color with OpenAI GPT-4 Vision."""
         try:
-            # Convert image to base64
-            img_base64 = self._image_to_base64(image)
-            
             prompt = f"""{config.SYSTEM_PROMPT}
 
 {config.JSON_PROMPT}"""
             
-            # Run synchronous call in thread pool
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
+            response = await self.openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {
@@ -116,7 +122,7 @@ class EnsembleColorAnalyzer:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{img_base64}"
+                                    "url": f"data:{image.mime_type};base64,{image.base64}"
                                 }
                             }
                         ]
@@ -127,7 +133,7 @@ class EnsembleColorAnalyzer:
             )
             
             response_text = response.choices[0].message.content
-            data = json.loads(response_text)
+            data = parse_llm_json(response_text)
             
             defaults = {
                 "undertone": "unknown",
@@ -145,20 +151,15 @@ class EnsembleColorAnalyzer:
     
     async def _analyze_with_claude(
         self, 
-        image: Image.Image
+        image: PreparedImage
     ) -> AnalyzeColorSeasonResponseModel:
         """Analyze color with Claude."""
         try:
-            # Convert image to base64
-            img_base64 = self._image_to_base64(image)
-            
             prompt = f"""{config.SYSTEM_PROMPT}
 
 {config.JSON_PROMPT}"""
             
-            # Run synchronous call in thread pool
-            message = await asyncio.to_thread(
-                self.anthropic_client.messages.create,
+            message = await self.anthropic_client.messages.create(
                 model="claude-sonnet-4-5",
                 max_tokens=1024,
                 temperature=0.3,
@@ -171,8 +172,8 @@ class EnsembleColorAnalyzer:
                                 "type": "image",
                                 "source": {
                                     "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": img_base64,
+                                    "media_type": image.mime_type,
+                                    "data": image.base64,
                                 },
                             },
                             {
@@ -185,16 +186,7 @@ class EnsembleColorAnalyzer:
             )
             
             response_text = message.content[0].text
-            # Clean JSON response
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            data = json.loads(response_text)
+            data = parse_llm_json(response_text)
             
             defaults = {
                 "undertone": "unknown",
@@ -253,8 +245,7 @@ Return ONLY a valid JSON object with the following structure:
 }}"""
         
         if judge_model == "gemini":
-            response = await asyncio.to_thread(
-                self.gemini_client.models.generate_content,
+            response = await self.gemini_client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 config=gemini_types.GenerateContentConfig(
                     response_mime_type="application/json",
@@ -263,8 +254,7 @@ Return ONLY a valid JSON object with the following structure:
             )
             response_text = response.text.strip()
         elif judge_model == "openai":
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
+            response = await self.openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {"role": "user", "content": judge_prompt}
@@ -274,8 +264,7 @@ Return ONLY a valid JSON object with the following structure:
             )
             response_text = response.choices[0].message.content
         else:  # claude
-            message = await asyncio.to_thread(
-                self.anthropic_client.messages.create,
+            message = await self.anthropic_client.messages.create(
                 model="claude-sonnet-4-5",
                 max_tokens=1024,
                 temperature=0.2,
@@ -285,16 +274,7 @@ Return ONLY a valid JSON object with the following structure:
             )
             response_text = message.content[0].text
         
-        # Clean JSON response
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        data = json.loads(response_text)
+        data = parse_llm_json(response_text)
         defaults = {
             "undertone": "unknown",
             "season": "unknown",
@@ -481,9 +461,40 @@ Return ONLY a valid JSON object with the following structure:
         # We have consensus - use voting for all fields
         return self._aggregate_voting(results)
     
+    async def _call_model(
+        self,
+        model: Literal["gemini", "openai", "claude"],
+        image: PreparedImage
+    ) -> AnalyzeColorSeasonResponseModel | Exception:
+        """Run one model's analysis under its provider cap; failures are returned, not raised."""
+        try:
+            async with self._provider_limits[model]:
+                return await self._analyzers[model](image)
+        except Exception as e:
+            return e
+    
+    async def _run_models(
+        self,
+        models: List[Literal["gemini", "openai", "claude"]],
+        image: PreparedImage
+    ) -> List[AnalyzeColorSeasonResponseModel | Exception]:
+        """
+        Run several models' analyses concurrently in one TaskGroup.
+        
+        A failed model does not cancel the others (the ensemble still
+        aggregates whichever succeed), but cancelling the request cancels
+        every in-flight provider call.
+        
+        Returns:
+            One result or exception per model, in order
+        """
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._call_model(model, image)) for model in models]
+        return [task.result() for task in tasks]
+    
     async def analyze_parallel(
         self,
-        image_input: str | Image.Image,
+        image_input: str | Image.Image | PreparedImage,
         aggregation_method: Literal["voting", "weighted_average", "consensus"] = "weighted_average"
     ) -> AnalyzeColorSeasonResponseModel:
         """
@@ -491,22 +502,18 @@ Return ONLY a valid JSON object with the following structure:
         
         This is the fastest approach and provides diverse perspectives.
         """
-        image = self._prepare_image(image_input)
-        
-        # Run all analyses in parallel
-        tasks = [
-            self._analyze_with_gemini(image),
-            self._analyze_with_openai(image),
-            self._analyze_with_claude(image),
-        ]
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async with self._ensemble_limit:
+            image = await self._prepare_image(image_input)
+            
+            # Run all analyses in parallel
+            models = ["gemini", "openai", "claude"]
+            results = await self._run_models(models, image)
         
         # Filter out exceptions and collect valid results
         valid_results = []
-        for i, result in enumerate(results):
+        for model, result in zip(models, results):
             if isinstance(result, Exception):
-                print(f"Model {i} failed: {result}")
+                logger.warning("Ensemble model %s failed: %s", model, result)
             else:
                 valid_results.append(result)
         
@@ -518,7 +525,7 @@ Return ONLY a valid JSON object with the following structure:
     
     async def analyze_hybrid(
         self,
-        image_input: str | Image.Image,
+        image_input: str | Image.Image | PreparedImage,
         judge_model: Literal["gemini", "openai", "claude"] = "gemini",
         parallel_models: Optional[List[Literal["gemini", "openai", "claude"]]] = None
     ) -> AnalyzeColorSeasonResponseModel:
@@ -527,8 +534,6 @@ Return ONLY a valid JSON object with the following structure:
         
         This provides deeper analysis and validation.
         """
-        image = self._prepare_image(image_input)
-        
         # Determine which models to use
         if parallel_models is None:
             # Default: Gemini and OpenAI analyze, Claude judges
@@ -538,33 +543,26 @@ Return ONLY a valid JSON object with the following structure:
                 all_models = ["gemini", "openai", "claude"]
                 parallel_models = [m for m in all_models if m != judge_model]
         
-        # Run parallel analyses
-        parallel_tasks = []
-        for model in parallel_models:
-            if model == "gemini":
-                parallel_tasks.append(self._analyze_with_gemini(image))
-            elif model == "openai":
-                parallel_tasks.append(self._analyze_with_openai(image))
-            elif model == "claude":
-                parallel_tasks.append(self._analyze_with_claude(image))
-        
-        parallel_results = await asyncio.gather(*parallel_tasks, return_exceptions=True)
-        
-        # Filter valid results
-        valid_results = []
-        for result in parallel_results:
-            if isinstance(result, Exception):
-                print(f"Parallel model failed: {result}")
-            else:
-                valid_results.append(result)
-        
-        if not valid_results:
-            raise ValueError("All parallel models failed")
-        
-        # Judge evaluates and merges results
-        judge_result = await self._judge_results(valid_results, judge_model=judge_model)
-        
-        return judge_result
+        async with self._ensemble_limit:
+            image = await self._prepare_image(image_input)
+            
+            # Run parallel analyses
+            parallel_results = await self._run_models(parallel_models, image)
+            
+            # Filter valid results
+            valid_results = []
+            for model, result in zip(parallel_models, parallel_results):
+                if isinstance(result, Exception):
+                    logger.warning("Parallel model %s failed: %s", model, result)
+                else:
+                    valid_results.append(result)
+            
+            if not valid_results:
+                raise ValueError("All parallel models failed")
+            
+            # Judge evaluates and merges results
+            async with self._provider_limits[judge_model]:
+                return await self._judge_results(valid_results, judge_model=judge_model)
 
 
 # Global instance
@@ -1,18 +1,67 @@
 """
 Stylist service - color analysis and outfit try-on business logic.
 """
+import asyncio
 import json
+from io import BytesIO
+from typing import Awaitable, Callable
 from PIL import Image
 from google.genai import types
 
 from src.config import config
-from src.models import AnalyzeColorSeasonResponseModel
-from src.utils.image_utils import base64_to_image
+from src.models import AnalyzeColorSeasonResponseModel, BodyShapeResponse, FaceShapeResponse
+from src.utils.image_utils import PreparedImage, base64_to_image, prepare_image_for_llm
+from src.utils.llm_json import parse_llm_json
 from src.services.ensemble import ensemble_analyzer
+from src.utils.cache import TTLCache, content_key
 
 client = config.get_client()
 
-def get_your_face_shape(image_input: str | Image.Image) -> str:
+# Color analysis results by analysis and image content, so re-uploads of the
+# same photo skip the LLM calls. The only color result cache: the API layer
+# reads through these functions
+COLOR_SEASON_CACHE_TTL = 3600  # seconds
+COLOR_SEASON_CACHE_THUMBNAIL = (256, 256)
+_color_season_cache = TTLCache(maxsize=4096, ttl=COLOR_SEASON_CACHE_TTL)
+
+COLOR_SEASON_CONFIG = types.GenerateContentConfig(
+    system_instruction=config.SYSTEM_PROMPT,
+    response_mime_type="application/json",
+)
+
+TRY_ON_CONFIG = types.GenerateContentConfig(
+    image_config=types.ImageConfig(
+        aspect_ratio="4:5",
+    )
+)
+
+FACE_SHAPE_CONFIG = types.GenerateContentConfig(
+    system_instruction="You are a helpful assistant that analyzes the face shape of a person in an image. You will return the face shape of the person in the image, your confidence (0.0-1.0) and your reasoning.",
+    response_mime_type="application/json",
+    response_schema=FaceShapeResponse,
+)
+
+BODY_SHAPE_CONFIG = types.GenerateContentConfig(
+    system_instruction="You are a helpful assistant that analyzes the body shape of a person in an image. You will return the body shape of the person in the image, your confidence (0.0-1.0) and your reasoning.",
+    response_mime_type="application/json",
+    response_schema=BodyShapeResponse,
+)
+
+
+def _image_cache_key(image: Image.Image) -> bytes:
+    """
+    Content key for an image: a digest of a small RGB thumbnail.
+    
+    Hashing the thumbnail instead of the encoded bytes makes re-encodes of the
+    same photo (different JPEG quality, PNG vs JPEG) share a key.
+    """
+    thumbnail = image.resize(COLOR_SEASON_CACHE_THUMBNAIL, Image.Resampling.BILINEAR)
+    if thumbnail.mode != "RGB":
+        thumbnail = thumbnail.convert("RGB")
+    return content_key(thumbnail.tobytes())
+
+
+def get_your_face_shape(image_input: str | Image.Image) -> FaceShapeResponse:
     """
     Analyze face shape from an image.
     """
@@ -23,16 +72,13 @@ def get_your_face_shape(image_input: str | Image.Image) -> str:
 
     response = client.models.generate_content(
         model="gemini-2.5-flash",
-        config=types.GenerateContentConfig(
-            system_instruction="You are a helpful assistant that analyzes the face shape of a person in an image. You will return the face shape of the person in the image.",
-            response_mime_type="text/plain",
-        ),
+        config=FACE_SHAPE_CONFIG,
         contents=[image],
     )
 
-    return response.text.strip()
+    return FaceShapeResponse.model_validate(parse_llm_json(response.text))
 
-def get_your_body_shape(image_input: str | Image.Image) -> str:
+def get_your_body_shape(image_input: str | Image.Image) -> BodyShapeResponse:
     """
     Analyze body shape from an image.
     """
@@ -43,14 +89,29 @@ def get_your_body_shape(image_input: str | Image.Image) -> str:
 
     response = client.models.generate_content(
         model="gemini-2.5-flash",
-        config=types.GenerateContentConfig(
-            system_instruction="You are a helpful assistant that analyzes the body shape of a person in an image. You will return the body shape of the person in the image.",
-            response_mime_type="text/plain",
-        ),
+        config=BODY_SHAPE_CONFIG,
         contents=[image],
     )
 
-    return response.text.strip()
+    return BodyShapeResponse.model_validate(parse_llm_json(response.text))
+
+def _load_image_with_key(image_input: str | Image.Image) -> tuple[Image.Image, bytes]:
+    """Decode the input if needed and compute its color-season cache key (CPU-bound)."""
+    if isinstance(image_input, str):
+        image = base64_to_image(image_input)
+    else:
+        image = image_input
+    return image, _image_cache_key(image)
+
+
+def _encode_image_part(image: Image.Image) -> types.Part:
+    """
+    Downscale and JPEG-encode an image for a Gemini request (CPU-bound).
+    
+    Passing a PIL image would make the SDK PNG-encode it at full resolution.
+    """
+    return types.Part.from_bytes(data=prepare_image_for_llm(image), mime_type="image/jpeg")
+
 
 def get_your_color_season(
     image_input: str | Image.Image,
@@ -58,6 +119,7 @@ def get_your_color_season(
     """
     Analyze color season from an image (single model - Gemini only).
     This is the original implementation for backward compatibility.
+    Results are cached by image content for COLOR_SEASON_CACHE_TTL seconds.
 
     Args:
         image_input: Either a base64 string/data URL or a PIL Image object
@@ -65,31 +127,90 @@ def get_your_color_season(
     Returns:
         AnalyzeColorSeasonResponseModel object
     """
-    if isinstance(image_input, str):
-        image = base64_to_image(image_input)
-    else:
-        image = image_input
+    image, image_key = _load_image_with_key(image_input)
+    cache_key = ("single", image_key)
+    cached = _color_season_cache.get(cache_key)
+    if cached is not None:
+        return cached.model_copy(deep=True)
 
     response = client.models.generate_content(
         model="gemini-2.5-flash",
-        config=types.GenerateContentConfig(
-            system_instruction=config.SYSTEM_PROMPT,
-            response_mime_type="application/json",
-        ),
-        contents=[image, config.JSON_PROMPT],
+        config=COLOR_SEASON_CONFIG,
+        contents=[_encode_image_part(image), config.JSON_PROMPT],
+    )
+    result = _parse_color_season(response.text)
+    _color_season_cache.set(cache_key, result.model_copy(deep=True))
+    return result
+
+
+async def _cached_color_season(
+    analysis: tuple,
+    image_input: str | Image.Image | PreparedImage,
+    analyze: Callable[[Image.Image | PreparedImage], Awaitable[AnalyzeColorSeasonResponseModel]],
+) -> AnalyzeColorSeasonResponseModel:
+    """
+    Return the cached result of an analysis for this image, or run analyze() and cache it.
+
+    Prepared images are keyed by their bytes; other inputs are decoded in a
+    worker thread and keyed by a thumbnail digest.
+
+    Args:
+        analysis: Cache key prefix naming the analysis and its parameters
+        image_input: A base64 string/data URL, a PIL Image or an already PreparedImage
+        analyze: Analysis to run on a miss, given the PIL Image or PreparedImage
+    """
+    if isinstance(image_input, PreparedImage):
+        image, image_key = image_input, content_key(image_input.data)
+    else:
+        image, image_key = await asyncio.to_thread(_load_image_with_key, image_input)
+    cache_key = (*analysis, image_key)
+    cached = _color_season_cache.get(cache_key)
+    if cached is not None:
+        return cached.model_copy(deep=True)
+
+    result = await analyze(image)
+    _color_season_cache.set(cache_key, result.model_copy(deep=True))
+    return result
+
+
+async def _analyze_color_season(image: Image.Image | PreparedImage) -> AnalyzeColorSeasonResponseModel:
+    """Run the single-model Gemini color analysis with the async client."""
+    if isinstance(image, PreparedImage):
+        image_part = types.Part.from_bytes(data=image.data, mime_type=image.mime_type)
+    else:
+        image_part = await asyncio.to_thread(_encode_image_part, image)
+    response = await client.aio.models.generate_content(
+        model="gemini-2.5-flash",
+        config=COLOR_SEASON_CONFIG,
+        contents=[image_part, config.JSON_PROMPT],
     )
+    return _parse_color_season(response.text)
 
+
+async def aget_your_color_season(
+    image_input: str | Image.Image | PreparedImage,
+) -> AnalyzeColorSeasonResponseModel:
+    """
+    Async variant of get_your_color_season using Gemini's async client.
+
+    Decoding, hashing and encoding run in worker threads; the Gemini call
+    itself holds no thread while waiting. Shares the same result cache.
+
+    Args:
+        image_input: Either a base64 string/data URL, a PIL Image object, or an
+            image already prepared for LLMs (sent as-is, keyed by its bytes)
+
+    Returns:
+        AnalyzeColorSeasonResponseModel object
+    """
+    return await _cached_color_season(("single",), image_input, _analyze_color_season)
+
+
+def _parse_color_season(response_text: str) -> AnalyzeColorSeasonResponseModel:
+    """Parse a Gemini color season reply into the response model."""
     try:
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
         response_text = response_text.strip()
-
-        data = json.loads(response_text)
+        data = parse_llm_json(response_text)
         
         # Provide defaults for missing fields
         defaults = {
@@ -121,54 +242,87 @@ def get_your_color_season(
 
 
 async def get_your_color_season_ensemble_parallel(
-    image_input: str | Image.Image,
+    image_input: str | Image.Image | PreparedImage,
     aggregation_method: str = "weighted_average"
 ) -> AnalyzeColorSeasonResponseModel:
     """
     Analyze color season using ensemble of 3 models (Gemini, OpenAI, Claude) in parallel.
     
     All models analyze simultaneously, then results are aggregated.
-    This is the fastest ensemble approach.
+    This is the fastest ensemble approach. Results are cached per method
+    and image content for COLOR_SEASON_CACHE_TTL seconds.
     
     Args:
-        image_input: Either a base64 string/data URL or a PIL Image object
+        image_input: A base64 string/data URL, a PIL Image or an already PreparedImage
         aggregation_method: "voting", "weighted_average", or "consensus"
     
     Returns:
         AnalyzeColorSeasonResponseModel object with aggregated results
     """
-    return await ensemble_analyzer.analyze_parallel(
-        image_input, 
-        aggregation_method=aggregation_method
+    return await _cached_color_season(
+        ("ensemble_parallel", aggregation_method),
+        image_input,
+        lambda image: ensemble_analyzer.analyze_parallel(image, aggregation_method=aggregation_method)
     )
 
 
 async def get_your_color_season_ensemble_hybrid(
-    image_input: str | Image.Image,
+    image_input: str | Image.Image | PreparedImage,
     judge_model: str = "gemini"
 ) -> AnalyzeColorSeasonResponseModel:
     """
     Analyze color season using hybrid ensemble approach.
     
     Two models analyze in parallel, third model acts as judge/evaluator.
-    This provides deeper analysis and validation.
+    This provides deeper analysis and validation. Results are cached per
+    judge and image content for COLOR_SEASON_CACHE_TTL seconds.
     
     Args:
-        image_input: Either a base64 string/data URL or a PIL Image object
+        image_input: A base64 string/data URL, a PIL Image or an already PreparedImage
         judge_model: "gemini", "openai", or "claude" - which model judges the results
     
     Returns:
         AnalyzeColorSeasonResponseModel object with judged results
     """
-    return await ensemble_analyzer.analyze_hybrid(
+    return await _cached_color_season(
+        ("ensemble_hybrid", judge_model),
         image_input,
-        judge_model=judge_model
+        lambda image: ensemble_analyzer.analyze_hybrid(image, judge_model=judge_model)
     )
 
 
+def _to_image(image_input: str | Image.Image) -> Image.Image:
+    """Decode a base64 string/data URL, or pass a PIL Image through."""
+    if isinstance(image_input, str):
+        return base64_to_image(image_input)
+    return image_input
+
+
+def _png_data(inline_data: types.Blob) -> bytes | None:
+    """Return generated image bytes if they are already PNG-encoded."""
+    return inline_data.data if inline_data.mime_type == "image/png" else None
+
+
+def _response_image(response: types.GenerateContentResponse) -> tuple[Image.Image | None, bytes | None]:
+    """
+    Return the first generated image in a Gemini response (text parts are printed).
+    
+    The image comes with its PNG bytes as returned by the model (None if it
+    was sent in another format), so callers need not encode it again.
+    """
+    for part in response.candidates[0].content.parts:
+        if part.text is not None:
+            print(part.text)
+        elif part.inline_data is not None:
+            image = Image.open(BytesIO(part.inline_data.data))
+            return image, _png_data(part.inline_data)
+    return None, None
+
+
 def get_outfit_on(
-    user_image_input: str | Image.Image, product_image_input: str | Image.Image
-) -> Image.Image:
+    user_image_input: str | Image.Image,
+    product_image_input: str | Image.Image,
+) -> tuple[Image.Image, bytes | None]:
     """
     Generate outfit try-on image.
 
@@ -177,154 +331,121 @@ def get_outfit_on(
         product_image_input: Either a base64 string/data URL or a PIL Image object
     
     Returns:
-        PIL Image object with the try-on result
+        PIL Image object with the try-on result, and its PNG bytes as
+        generated (None if the model did not return PNG)
     """
-    prompt = config.NANO_BANANA_PROMPT
+    contents = [config.NANO_BANANA_PROMPT, _to_image(user_image_input), _to_image(product_image_input)]
 
-    # Convert to PIL Images if they're strings
-    if isinstance(user_image_input, str):
-        user_image = base64_to_image(user_image_input)
-    else:
-        user_image = user_image_input
+    response = client.models.generate_content(
+        model="gemini-3-pro-image-preview",
+        contents=contents,
+        config=TRY_ON_CONFIG,
+    )
+    return _response_image(response)
 
-    if isinstance(product_image_input, str):
-        product_image = base64_to_image(product_image_input)
-    else:
-        product_image = product_image_input
 
-    contents = [prompt, user_image, product_image]
+async def aget_outfit_on(
+    user_image_input: str | Image.Image,
+    product_image_input: str | Image.Image,
+) -> tuple[Image.Image, bytes | None]:
+    """
+    Async variant of get_outfit_on using Gemini's async client.
 
-    response = client.models.generate_content(
+    Base64 decoding and request encoding run in worker threads; the
+    generation call itself holds no thread while waiting.
+
+    Args:
+        user_image_input: Either a base64 string/data URL or a PIL Image object
+        product_image_input: Either a base64 string/data URL or a PIL Image object
+    
+    Returns:
+        PIL Image object with the try-on result, and its PNG bytes as
+        generated (None if the model did not return PNG)
+    """
+    user_image, product_image = await asyncio.gather(
+        asyncio.to_thread(_to_image, user_image_input),
+        asyncio.to_thread(_to_image, product_image_input),
+    )
+    response = await client.aio.models.generate_content(
         model="gemini-3-pro-image-preview",
-        contents=contents,
-        config=types.GenerateContentConfig(
-            image_config=types.ImageConfig(
-                aspect_ratio="4:5",
-            )
-        ),
+        contents=[config.NANO_BANANA_PROMPT, user_image, product_image],
+        config=TRY_ON_CONFIG,
     )
+    return await asyncio.to_thread(_response_image, response)
 
-    for part in response.candidates[0].content.parts:
-        if part.text is not None:
-            print(part.text)
-        elif part.inline_data is not None:
-            from io import BytesIO
-            image = Image.open(BytesIO(part.inline_data.data))
-            return image
 
 def get_outfit_on_full_outfit(
     user_image_input: str | Image.Image,
     upper_image_input: str | Image.Image,
     lower_image_input: str | Image.Image,
     shoes_image_input: str | Image.Image,
-) -> Image.Image:
+) -> tuple[Image.Image, bytes | None]:
     """
     Generate full outfit try-on image.
+    
+    Returns the image with its PNG bytes as generated, like get_outfit_on().
     """
-    prompt = config.FULL_OUTFIT_PROMPT
-
-    if isinstance(user_image_input, str):
-        user_image = base64_to_image(user_image_input)
-    else:
-        user_image = user_image_input
-
-    if isinstance(upper_image_input, str):
-        upper_image = base64_to_image(upper_image_input)
-    else:
-        upper_image = upper_image_input
-
-    if isinstance(lower_image_input, str):
-        lower_image = base64_to_image(lower_image_input)
-    else:
-        lower_image = lower_image_input
-
-    if isinstance(shoes_image_input, str):
-        shoes_image = base64_to_image(shoes_image_input)
-    else:
-        shoes_image = shoes_image_input
-
-    contents = [prompt, user_image, upper_image, lower_image, shoes_image]
+    contents = [
+        config.FULL_OUTFIT_PROMPT,
+        _to_image(user_image_input),
+        _to_image(upper_image_input),
+        _to_image(lower_image_input),
+        _to_image(shoes_image_input),
+    ]
 
     response = client.models.generate_content(
         model="gemini-3-pro-image-preview",
         contents=contents,
-        config=types.GenerateContentConfig(
-            image_config=types.ImageConfig(
-                aspect_ratio="4:5",
-            )
-        ),
+        config=TRY_ON_CONFIG,
     )
+    return _response_image(response)
 
-    for part in response.candidates[0].content.parts:
-        if part.text is not None:
-            print(part.text)
-        elif part.inline_data is not None:
-            from io import BytesIO
-            image = Image.open(BytesIO(part.inline_data.data))
-            return image
 
 def get_outfit_on_full_outfit_on_sequential(
     user_image_input: str | Image.Image,
     upper_image_input: str | Image.Image,
     lower_image_input: str | Image.Image,
     shoes_image_input: str | Image.Image,
-) -> Image.Image:
+) -> tuple[Image.Image, bytes | None]:
     """
     Generate full outfit try-on image from base64-encoded images.
+    
+    Returns the last stage's image with its PNG bytes as generated, like
+    get_outfit_on(); the bytes are None if the image had to be converted.
     """
     prompt = config.NANO_BANANA_PROMPT
 
-    if isinstance(user_image_input, str):
-        user_image = base64_to_image(user_image_input)
-    else:
-        user_image = user_image_input
-
-    if isinstance(upper_image_input, str):
-        upper_image = base64_to_image(upper_image_input)
-    else:
-        upper_image = upper_image_input
-
-    if isinstance(lower_image_input, str):
-        lower_image = base64_to_image(lower_image_input)
-    else:
-        lower_image = lower_image_input
-
-    if isinstance(shoes_image_input, str):
-        shoes_image = base64_to_image(shoes_image_input)
-    else:
-        shoes_image = shoes_image_input
+    user_image = _to_image(user_image_input)
+    upper_image = _to_image(upper_image_input)
+    lower_image = _to_image(lower_image_input)
+    shoes_image = _to_image(shoes_image_input)
 
     # Start with the original user image, then update it with each generated result
     current_image = user_image
+    png_bytes = None
 
     for product in [upper_image, lower_image, shoes_image]:
         contents = [prompt, current_image, product]
         response = client.models.generate_content(
             model="gemini-2.5-flash-image",
             contents=contents,
-            config=types.GenerateContentConfig(
-                image_config=types.ImageConfig(
-                    aspect_ratio="4:5",
-                )
-            ),
+            config=TRY_ON_CONFIG,
         )
         for part in response.candidates[0].content.parts:
             if part.text is not None:
                 print(part.text)
             elif part.inline_data is not None:
-                from io import BytesIO
-                # Get the generated image
-                temp_image = Image.open(BytesIO(part.inline_data.data))
-                
-                # Create a completely new image by copying the data
-                # This ensures the image is independent of the BytesIO buffer
-                current_image = Image.new(temp_image.mode, temp_image.size)
-                current_image.putdata(list(temp_image.getdata()))
+                # Decode the generated image once; load() makes it independent
+                # of the BytesIO buffer without copying pixels through Python
+                current_image = Image.open(BytesIO(part.inline_data.data))
+                current_image.load()
+                png_bytes = _png_data(part.inline_data)
                 
                 # Convert to RGB if necessary
                 if current_image.mode != 'RGB':
                     current_image = current_image.convert('RGB')
-    return current_image
+                    png_bytes = None
+    return current_image, png_bytes
 
 
 def score_outfit_compatibility(
@@ -384,15 +505,7 @@ Return ONLY a valid JSON object with this exact structure:
     
     try:
         response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        data = json.loads(response_text)
+        data = parse_llm_json(response_text)
         
         # Ensure all required fields exist
         result = {
@@ -1,15 +1,19 @@
 """
 Authentication utilities for password hashing and JWT tokens.
 """
+import hashlib
+import hmac
 import os
+import time
 import bcrypt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from src.database.user_db import get_db, User
+from src.utils.cache import TTLCache
 from src.utils.logger import get_logger
 
 logger = get_logger("utils.auth")
@@ -22,6 +26,23 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60 # 30 days
 
+# Recent successful logins skip the bcrypt check for a short window.
+# Keys are keyed BLAKE2b digests of (email, password) with a per-process key,
+# so plaintext passwords are never stored; values are the matching password hash.
+LOGIN_CACHE_TTL = int(os.getenv("LOGIN_CACHE_TTL", "30"))  # seconds
+_login_cache = TTLCache(maxsize=10000, ttl=LOGIN_CACHE_TTL)
+_login_cache_secret = os.urandom(32)
+
+# bcrypt work factor (log2 of the key-expansion rounds). Each +1 doubles hashing time;
+# existing hashes keep the cost they were created with, so changing this is safe.
+BCRYPT_ROUNDS = min(max(int(os.getenv("BCRYPT_ROUNDS", "12")), 4), 31)
+logger.info(f"Password hashing: bcrypt {bcrypt.__version__}, rounds={BCRYPT_ROUNDS}")
+
+# Resolved users per bearer token, so authenticated requests skip the JWT decode
+# and the users-table lookup. Entries never outlive the token's exp claim.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+_user_cache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL)
+
 if not SECRET_KEY:
     logger.warning("SECRET_KEY not set in environment variables! Using default (not secure for production)")
     SECRET_KEY = "your-secret-key-change-in-production"
@@ -39,7 +60,7 @@ def get_password_hash(password: str) -> str:
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
     # Generate salt and hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -76,11 +97,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         raise
 
 
+class CurrentUser(NamedTuple):
+    """Authenticated user fields, detached from any DB session."""
+    id: int
+    email: str
+    created_at: Optional[datetime]
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
+) -> CurrentUser:
+    """
+    Get the current authenticated user from JWT token.
+    
+    Resolved users are cached per token for USER_CACHE_TTL seconds (never past
+    the token's expiry); the DB session is only used on a cache miss.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -88,6 +121,13 @@ def get_current_user(
     )
     
     token = credentials.credentials
+    cache_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    cached = _user_cache.get(cache_key)
+    if cached is not None:
+        current_user, expires_at = cached
+        if expires_at is None or time.time() < expires_at:
+            return current_user
+        _user_cache.pop(cache_key)
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -109,19 +149,43 @@ def get_current_user(
         raise credentials_exception
     
     logger.debug(f"User authenticated: user_id={user_id}, email={user.email}")
-    return user
+    current_user = CurrentUser(id=user.id, email=user.email, created_at=user.created_at)
+    _user_cache.set(cache_key, (current_user, payload.get("exp")))
+    return current_user
+
+
+def _login_cache_key(email: str, password: str) -> bytes:
+    """Derive the login cache key without keeping the password around."""
+    return hashlib.blake2b(
+        email.encode("utf-8") + b"\x00" + password.encode("utf-8"),
+        digest_size=16,
+        key=_login_cache_secret
+    ).digest()
 
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user by email and password."""
+    """
+    Authenticate a user by email and password.
+    
+    A login that succeeded within LOGIN_CACHE_TTL seconds skips bcrypt, as long
+    as the stored password hash is unchanged (a password change invalidates it).
+    """
     try:
         user = db.query(User).filter(User.email == email).first()
         if not user:
             logger.debug(f"Authentication failed: User not found - {email}")
             return None
+        
+        cache_key = _login_cache_key(email, password)
+        cached_hash = _login_cache.get(cache_key)
+        if cached_hash is not None and hmac.compare_digest(cached_hash, user.password_hash):
+            logger.debug(f"Authentication successful (cached): {email}")
+            return user
+        
         if not verify_password(password, user.password_hash):
             logger.debug(f"Authentication failed: Invalid password - {email}")
             return None
+        _login_cache.set(cache_key, user.password_hash)
         logger.debug(f"Authentication successful: {email}")
         return user
     except Exception as e:
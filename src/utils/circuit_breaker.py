@@ -0,0 +1,85 @@
+"""
+Circuit breaker for calls to upstream services (LLM providers).
+"""
+import threading
+import time
+
+from src.utils.logger import get_logger
+
+logger = get_logger("utils.circuit_breaker")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated upstream failures.
+    
+    After fail_max consecutive failures the circuit opens and before_call()
+    raises CircuitOpenError for reset_timeout seconds. After that one trial
+    call is let through (half-open): success closes the circuit, failure
+    opens it again, and release_trial() lets another call try.
+    """
+    
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected."""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout
+            )
+    
+    def before_call(self) -> None:
+        """
+        Gate a call.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._trial_in_flight = True
+    
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.name} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def release_trial(self) -> None:
+        """
+        End a call that says nothing about upstream health (e.g. a rejected
+        request or a cancelled call) without changing the circuit state.
+        
+        Frees the half-open trial slot so the next call can try again.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit after fail_max in a row."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
@@ -0,0 +1,84 @@
+"""
+HTTP caching helpers (Cache-Control / ETag / 304 Not Modified).
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+from src.utils.responses import ORJSONResponse
+
+# Default freshness window for cacheable GET endpoints
+DEFAULT_MAX_AGE = 60  # seconds
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Build a weak ETag from response bytes.
+    
+    Args:
+        body: Serialized response body
+    
+    Returns:
+        ETag header value, e.g. W/"5d41402abc4b2a76b9719d911017c592"
+    """
+    return f'W/"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+    
+    Args:
+        if_none_match: Raw If-None-Match header value, if any
+        etag: Current ETag of the resource
+    
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str | None = None,
+    max_age: int = DEFAULT_MAX_AGE,
+    media_type: str = "application/json"
+) -> Response:
+    """
+    Return body with Cache-Control/ETag headers, or 304 if the client has it.
+    
+    Args:
+        request: Incoming request (for If-None-Match)
+        body: Serialized response body
+        etag: Precomputed ETag; derived from body when omitted
+        max_age: Cache-Control max-age in seconds
+        media_type: Response content type
+    
+    Returns:
+        200 response with body, or empty 304 response
+    """
+    etag = etag or make_etag(body)
+    headers = {"Cache-Control": f"public, max-age={max_age}", "ETag": etag}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def cached_json_response(request: Request, content: Any, max_age: int = DEFAULT_MAX_AGE) -> Response:
+    """
+    Serialize content as JSON and return it via cached_response().
+    """
+    body = ORJSONResponse(content).body
+    return cached_response(request, body, max_age=max_age)
@@ -2,30 +2,195 @@
 Image utility functions.
 """
 import base64
+import binascii
 from io import BytesIO
+from typing import NamedTuple
 from PIL import Image
 
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+# Longest data URL header searched for the comma ("data:image/jpeg;base64,")
+DATA_URL_PREFIX_MAX = 64
+
+# Images sent to vision LLMs: providers downsample larger inputs anyway, so
+# bigger images only add upload bytes and provider-side preprocessing
+LLM_MAX_DIMENSION = 1024
+LLM_JPEG_QUALITY = 85
+
+_turbojpeg = None
+
+
+class PreparedImage(NamedTuple):
+    """
+    An image downscaled and JPEG-encoded once for LLM requests.
+    
+    Carries both the raw bytes (Gemini) and base64 (OpenAI, Claude), so every
+    provider reuses the same encoding.
+    """
+    data: bytes
+    base64: str
+    mime_type: str
+
+
+def _get_turbojpeg():
+    """Load libjpeg-turbo once; returns None if the shared library is missing."""
+    global _turbojpeg, TURBOJPEG_AVAILABLE
+    if _turbojpeg is None and TURBOJPEG_AVAILABLE:
+        try:
+            _turbojpeg = TurboJPEG()
+        except (OSError, RuntimeError):
+            TURBOJPEG_AVAILABLE = False
+    return _turbojpeg
+
+
+def decode_data_url(base64_string_or_data_url: str) -> bytes:
+    """
+    Decode a base64 string or data URL to raw bytes.
+
+    Uses pybase64's SIMD decoder when installed, otherwise binascii.a2b_base64
+    directly (skipping the wrapper overhead of base64.b64decode). Both discard
+    non-alphabet characters.
+
+    Args:
+        base64_string_or_data_url: Base64 string (with or without data URL prefix)
+
+    Returns:
+        Decoded bytes
+
+    Raises:
+        binascii.Error: If the payload is not valid base64
+        ValueError: If a data URL has no comma ending its header
+    """
+    # Remove data URL prefix if present (e.g., "data:image/png;base64,")
+    if base64_string_or_data_url.startswith("data:"):
+        comma = base64_string_or_data_url.find(",", 0, DATA_URL_PREFIX_MAX)
+        if comma < 0:
+            raise ValueError(f"Malformed data URL: no ',' within the first {DATA_URL_PREFIX_MAX} characters")
+        base64_string_or_data_url = base64_string_or_data_url[comma + 1:]
+
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode(base64_string_or_data_url)
+    return binascii.a2b_base64(base64_string_or_data_url)
+
+
+def encode_base64(data: bytes | memoryview) -> str:
+    """
+    Base64-encode bytes to an ASCII string.
+    
+    Uses pybase64's SIMD encoder when installed, which also returns str
+    directly without a separate decode step.
+    """
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode("ascii")
+
+
+def encode_base64_bytes(data: bytes | memoryview) -> bytes:
+    """Base64-encode bytes to ASCII bytes, with pybase64 when installed."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode(data)
+    return base64.b64encode(data)
+
+
+def bytes_to_image(image_data: bytes) -> Image.Image:
+    """
+    Decode image bytes to a PIL Image object.
+
+    JPEGs are decoded with libjpeg-turbo when PyTurboJPEG is installed
+    (several times faster than Pillow for large photos); everything else,
+    or any JPEG turbojpeg rejects, goes through Pillow.
+
+    Args:
+        image_data: Encoded image bytes
+
+    Returns:
+        PIL Image object
+    """
+    if image_data[:3] == JPEG_MAGIC:
+        jpeg = _get_turbojpeg()
+        if jpeg is not None:
+            try:
+                return Image.fromarray(jpeg.decode(image_data, pixel_format=TJPF_RGB))
+            except (OSError, ValueError):
+                pass
+
+    return Image.open(BytesIO(image_data))
+
 
 def base64_to_image(base64_string_or_data_url: str) -> Image.Image:
     """
     Convert a base64 string or data URL to a PIL Image object.
 
+    CPU-bound for large images; call it from a worker thread in async code.
+
     Args:
         base64_string_or_data_url: Base64 string (with or without data URL prefix)
 
     Returns:
         PIL Image object
     """
-    # Remove data URL prefix if present (e.g., "data:image/png;base64,")
-    if base64_string_or_data_url.startswith("data:"):
-        # Extract base64 part after the comma
-        base64_string_or_data_url = base64_string_or_data_url.split(",", 1)[1]
+    return bytes_to_image(decode_data_url(base64_string_or_data_url))
 
-    # Decode base64 string to bytes
-    image_data = base64.b64decode(base64_string_or_data_url)
 
-    # Create PIL Image from bytes
-    image = Image.open(BytesIO(image_data))
+def prepare_image(
+    image: Image.Image,
+    max_dimension: int = LLM_MAX_DIMENSION,
+    quality: int = LLM_JPEG_QUALITY
+) -> PreparedImage:
+    """
+    Downscale and encode an image once for any number of LLM providers.
+
+    CPU-bound; call it from a worker thread in async code.
+
+    Args:
+        image: PIL Image object
+        max_dimension: Longest side of the encoded image in pixels
+        quality: JPEG quality
+
+    Returns:
+        PreparedImage with the JPEG bytes and their base64
+    """
+    data = prepare_image_for_llm(image, max_dimension, quality)
+    return PreparedImage(data=data, base64=encode_base64(data), mime_type="image/jpeg")
+
 
-    return image
+def prepare_image_for_llm(
+    image: Image.Image,
+    max_dimension: int = LLM_MAX_DIMENSION,
+    quality: int = LLM_JPEG_QUALITY
+) -> bytes:
+    """
+    Downscale an image and encode it as JPEG for a vision LLM request.
+
+    The input image is left untouched. CPU-bound; call it from a worker
+    thread in async code, and encode once when several providers get the
+    same image.
+
+    Args:
+        image: PIL Image object
+        max_dimension: Longest side of the encoded image in pixels
+        quality: JPEG quality
+
+    Returns:
+        JPEG bytes
+    """
+    if max(image.size) > max_dimension:
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
 
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
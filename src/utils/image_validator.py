@@ -4,7 +4,12 @@ Validates image size, format, and face detection.
 """
 from PIL import Image
 from io import BytesIO
-from typing import Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Tuple, Optional
+import asyncio
+import multiprocessing
+import os
 from fastapi import HTTPException
 import numpy as np
 
@@ -14,6 +19,7 @@ try:
 except ImportError:
     CV2_AVAILABLE = False
 
+from src.utils.image_utils import LLM_MAX_DIMENSION, PreparedImage, decode_data_url, prepare_image
 from src.utils.logger import get_logger
 
 logger = get_logger("utils.image_validator")
@@ -30,6 +36,56 @@ DEFAULT_MAX_DIMENSION = 6048  # Maximum width or height in pixels
 DEFAULT_MIN_DIMENSION = 100  # Minimum width or height in pixels
 ALLOWED_FORMATS = {"JPEG", "PNG", "JPG", "WEBP"}
 
+# Decoding and face detection are CPU-bound and hold the GIL for most of their
+# run, so they scale with processes rather than threads. Every server worker
+# spawns its own pool, so by default the CPUs are split between them
+# (UVICORN_WORKERS, as in gunicorn.conf.py) instead of each taking them all.
+SERVER_WORKERS = int(os.getenv("UVICORN_WORKERS", "4"))
+IMAGE_POOL_WORKERS = (
+    int(os.getenv("IMAGE_POOL_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // SERVER_WORKERS)
+)
+_image_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    """
+    Return this process's image validation pool, creating it on first use.
+    
+    Created lazily so each forked server worker gets its own pool. Workers are
+    spawned rather than forked: the server process already runs threads.
+    """
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = ProcessPoolExecutor(
+            max_workers=IMAGE_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _image_pool
+
+
+def shutdown_image_pool() -> None:
+    """Shut down the image validation pool; the next get_image_pool() starts a new one."""
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=False, cancel_futures=True)
+        _image_pool = None
+
+
+async def run_in_image_pool(func: Callable, *args: Any) -> Any:
+    """
+    Run func(*args) in the image validation pool without blocking the event loop.
+    
+    The pool's IMAGE_POOL_WORKERS bound how many images are processed at once;
+    further calls queue until a worker frees up.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_image_pool(), func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge image); start a fresh pool next time
+        shutdown_image_pool()
+        raise
+
 
 def validate_image_size(image: Image.Image, max_dimension: int = DEFAULT_MAX_DIMENSION, 
                         min_dimension: int = DEFAULT_MIN_DIMENSION) -> Tuple[int, int]:
@@ -259,8 +315,10 @@ def validate_image_from_bytes(
         image = Image.open(BytesIO(image_bytes))
         # Verify it's actually an image by loading it
         image.verify()
-        # Reopen because verify() closes the image
+        # Reopen because verify() closes the image, and decode it here so the
+        # caller's thread pays for it rather than the first pixel access
         image = Image.open(BytesIO(image_bytes))
+        image.load()
     except Exception as e:
         raise ImageValidationError(f"Invalid image file: {str(e)}")
     
@@ -278,6 +336,19 @@ def validate_image_from_bytes(
     return image, validation_result
 
 
+def decode_base64_image(base64_string: str) -> bytes:
+    """
+    Decode a base64 image string (with or without data URL prefix).
+    
+    Raises:
+        ImageValidationError: If the string is not valid base64
+    """
+    try:
+        return decode_data_url(base64_string)
+    except Exception as e:
+        raise ImageValidationError(f"Invalid base64 encoding: {str(e)}")
+
+
 def validate_image_from_base64(
     base64_string: str,
     require_face: bool = False,
@@ -303,19 +374,8 @@ def validate_image_from_base64(
     Raises:
         ImageValidationError: If validation fails
     """
-    import base64 as b64
-    
-    # Remove data URL prefix if present
-    if base64_string.startswith("data:"):
-        base64_string = base64_string.split(",", 1)[1]
-    
-    try:
-        image_bytes = b64.b64decode(base64_string)
-    except Exception as e:
-        raise ImageValidationError(f"Invalid base64 encoding: {str(e)}")
-    
     return validate_image_from_bytes(
-        image_bytes=image_bytes,
+        image_bytes=decode_base64_image(base64_string),
         require_face=require_face,
         max_dimension=max_dimension,
         min_dimension=min_dimension,
@@ -323,3 +383,74 @@ def validate_image_from_base64(
         max_size_mb=max_size_mb
     )
 
+
+
+def decode_and_validate(
+    payload: bytes | str,
+    require_face: bool = False,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    min_dimension: int = DEFAULT_MIN_DIMENSION,
+    fit_within: Optional[int] = None
+) -> Tuple[Image.Image, dict]:
+    """
+    Decode and validate raw image bytes or a base64 string in one call.
+    
+    Entry point for get_image_pool(): the whole decode + face detection runs
+    in a single task, and the image comes back pickled as raw pixel data.
+    
+    Args:
+        payload: Image bytes, or a base64 string (with or without data URL prefix)
+        require_face: Whether to require face detection
+        max_dimension: Maximum allowed width or height
+        min_dimension: Minimum allowed width or height
+        fit_within: Optional size to downscale the validated image to (long
+            side), before it is pickled back from the pool
+    
+    Returns:
+        Tuple of (PIL Image, validation results dict)
+    
+    Raises:
+        ImageValidationError: If validation fails
+    """
+    validator = validate_image_from_base64 if isinstance(payload, str) else validate_image_from_bytes
+    image, validation_result = validator(
+        payload,
+        require_face=require_face,
+        max_dimension=max_dimension,
+        min_dimension=min_dimension
+    )
+    image.load()
+    if fit_within is not None:
+        image.thumbnail((fit_within, fit_within), Image.Resampling.LANCZOS)
+    return image, validation_result
+
+
+def validate_and_prepare(
+    payload: bytes | str,
+    require_face: bool = False,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    min_dimension: int = DEFAULT_MIN_DIMENSION,
+    prepared_dimension: int = LLM_MAX_DIMENSION
+) -> Tuple[PreparedImage, dict]:
+    """
+    Decode and validate an image, then downscale and JPEG-encode it for LLMs.
+    
+    Entry point for get_image_pool() when callers only need the prepared
+    image: a few hundred KB of JPEG is pickled back instead of the decoded
+    full-resolution pixels.
+    
+    Args:
+        payload: Image bytes, or a base64 string (with or without data URL prefix)
+        require_face: Whether to require face detection
+        max_dimension: Maximum allowed width or height
+        min_dimension: Minimum allowed width or height
+        prepared_dimension: Longest side of the prepared JPEG
+    
+    Returns:
+        Tuple of (PreparedImage, validation results dict)
+    
+    Raises:
+        ImageValidationError: If validation fails
+    """
+    image, validation_result = decode_and_validate(payload, require_face, max_dimension, min_dimension)
+    return prepare_image(image, prepared_dimension), validation_result
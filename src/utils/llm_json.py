@@ -0,0 +1,28 @@
+"""
+Parsing helpers for JSON returned by LLMs.
+"""
+import re
+
+import orjson
+
+# Leading/trailing markdown fences models sometimes wrap JSON in
+_FENCE = re.compile(rb"\A\s*```(?:json)?\s*|\s*```\s*\Z")
+
+
+def parse_llm_json(text: str | bytes) -> dict:
+    """
+    Parse an LLM JSON reply, stripping optional ```json fences.
+    
+    Args:
+        text: Raw model output as str or UTF-8 bytes
+    
+    Returns:
+        Parsed JSON object
+    
+    Raises:
+        orjson.JSONDecodeError: If the reply is not valid JSON
+            (a subclass of json.JSONDecodeError and ValueError)
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return orjson.loads(_FENCE.sub(b"", text))
@@ -1,11 +1,14 @@
 """
 Logging configuration for the application.
 """
+import atexit
+import json
 import os
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
 # Create logs directory if it doesn't exist
@@ -22,11 +25,50 @@ DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 # Detailed format for file logging
 DETAILED_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s() - %(message)s"
 
+# Emit one JSON object per line instead of plain text
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+
+
+# Attributes every LogRecord has; anything else was passed via extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format log records as single-line JSON for log aggregators.
+    
+    Fields passed through extra={...} are emitted as top-level keys.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+# Background listener that drains the log queue into the real handlers
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
 
 def setup_logger(name: str = "hackseoul", level: str = "INFO") -> logging.Logger:
     """
     Set up a logger with both console and file handlers.
     
+    Callers only enqueue records through a QueueHandler; a background
+    QueueListener thread does the formatting and stdout/file writes.
+    
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -47,9 +89,11 @@ def setup_logger(name: str = "hackseoul", level: str = "INFO") -> logging.Logger
     # Console handler (stdout)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
-    console_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    if LOG_JSON:
+        console_formatter = JSONFormatter(datefmt=DATE_FORMAT)
+    else:
+        console_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
     
     # File handler with rotation
     file_handler = RotatingFileHandler(
@@ -59,9 +103,23 @@ def setup_logger(name: str = "hackseoul", level: str = "INFO") -> logging.Logger
         encoding="utf-8"
     )
     file_handler.setLevel(log_level)
-    file_formatter = logging.Formatter(DETAILED_FORMAT, DATE_FORMAT)
+    if LOG_JSON:
+        file_formatter = JSONFormatter(datefmt=DATE_FORMAT)
+    else:
+        file_formatter = logging.Formatter(DETAILED_FORMAT, DATE_FORMAT)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    
+    global _listener, _queue_handler
+    log_queue = queue.Queue(-1)
+    _queue_handler = QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    _listener = QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
     
     # Prevent propagation to root logger
     logger.propagate = False
@@ -69,6 +127,30 @@ def setup_logger(name: str = "hackseoul", level: str = "INFO") -> logging.Logger
     return logger
 
 
+def stop_logging() -> None:
+    """
+    Flush queued log records and stop the background listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    """
+    Threads do not survive fork, so forked workers (e.g. gunicorn --preload)
+    get a fresh queue and listener thread over the same handlers.
+    """
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
 def get_logger(name: str = None) -> logging.Logger:
     """
     Get a logger instance. If name is provided, returns a child logger.
@@ -87,3 +169,6 @@ def get_logger(name: str = None) -> logging.Logger:
 # Initialize root logger
 root_logger = setup_logger("hackseoul", os.getenv("LOG_LEVEL", "INFO"))
 
+# Scripts that never run the app lifespan still flush on exit
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
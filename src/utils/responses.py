@@ -0,0 +1,38 @@
+"""
+Response classes for the API.
+"""
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson instead of the stdlib json module.
+    
+    Numpy arrays and non-string dict keys (e.g. ints in metrics) are serialized
+    natively.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    """
+    HTTPException handler that renders {"detail": ...} with orjson.
+    
+    Same behaviour as FastAPI's default handler, which uses the stdlib
+    json-based JSONResponse regardless of the app's default response class.
+    """
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
@@ -1,10 +1,19 @@
 """
 Pytest configuration and fixtures.
 """
+import os
+import tempfile
 import pytest
 from PIL import Image
 from io import BytesIO
 
+# API modules create their LLM clients and database engine at import time;
+# give them dummy keys and a throwaway SQLite database (no network is used)
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
 
 @pytest.fixture
 def sample_image():
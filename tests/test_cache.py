@@ -0,0 +1,64 @@
+"""
+Unit tests for in-process caching utilities.
+"""
+import hashlib
+import time
+
+from src.utils import cache
+from src.utils.cache import TTLCache, content_key
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+    
+    def test_get_and_set(self):
+        """Test basic get/set and default on miss."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+    
+    def test_expiry(self):
+        """Test that entries expire after ttl."""
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+    
+    def test_pop_and_clear(self):
+        """Test removing single entries and clearing."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestContentKey:
+    """Tests for content_key."""
+    
+    def test_stable_and_distinct(self):
+        """Test equal data gives equal 16-byte keys and different data does not."""
+        assert content_key(b"image bytes") == content_key(b"image bytes")
+        assert content_key(b"image bytes") != content_key(b"other bytes")
+        assert len(content_key(b"image bytes")) == 16
+    
+    def test_blake2b_fallback(self, monkeypatch):
+        """Test the BLAKE2b fallback when xxhash is not installed."""
+        monkeypatch.setattr(cache, "XXHASH_AVAILABLE", False)
+        assert content_key(b"data") == hashlib.blake2b(b"data", digest_size=16).digest()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the circuit breaker.
+"""
+import time
+
+import pytest
+
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+    
+    def test_opens_after_fail_max(self):
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker("test", fail_max=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        assert not breaker.is_open
+        
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    
+    def test_success_resets_failures(self):
+        """Test that a success resets the consecutive failure count."""
+        breaker = CircuitBreaker("test", fail_max=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+    
+    def test_half_open_trial(self):
+        """Test that one trial call is allowed after reset_timeout."""
+        breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        
+        breaker.before_call()  # trial call allowed
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one trial at a time
+        
+        breaker.record_success()
+        assert not breaker.is_open
+        breaker.before_call()
+    
+    def test_failed_trial_reopens(self):
+        """Test that a failed trial call opens the circuit again."""
+        breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.before_call()
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    
+    def test_released_trial_allows_next_call(self):
+        """Test that releasing a trial call lets the next call try, circuit still open."""
+        breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.before_call()
+        breaker.release_trial()
+        assert breaker.is_open is False
+        breaker.before_call()  # a new trial call
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    
+    @pytest.mark.asyncio
+    async def test_non_transient_error_releases_trial(self, monkeypatch, sample_image):
+        """Test that a Gemini client error during a trial call does not wedge the circuit."""
+        from google.genai import errors as genai_errors
+        from src.api import beauty
+        
+        breaker = CircuitBreaker("gemini", fail_max=1, reset_timeout=0.01)
+        monkeypatch.setattr(beauty, "gemini_breaker", breaker)
+        
+        async def rejected(*args):
+            raise genai_errors.ClientError(400, {"error": {"message": "bad", "status": "INVALID_ARGUMENT"}})
+        monkeypatch.setattr(beauty, "_stream_gemini_text", rejected)
+        
+        breaker.record_failure()
+        time.sleep(0.02)
+        with pytest.raises(genai_errors.ClientError):
+            await beauty._call_gemini_json(sample_image, "prompt", None)
+        breaker.before_call()  # not rejected with CircuitOpenError
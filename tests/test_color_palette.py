@@ -0,0 +1,29 @@
+"""
+Tests for color palette season lookup.
+"""
+import pytest
+
+from src.api.color import _resolve_season
+
+
+class TestResolveSeason:
+    """Tests for matching a season query to its palette."""
+
+    @pytest.mark.parametrize("query, season, match_type", [
+        ("Deep Autumn", "Deep Autumn", "exact"),
+        ("  Soft Summer ", "Soft Summer", "exact"),
+        ("deep autumn", "Deep Autumn", "case-insensitive"),
+        ("Autumn", "Warm Autumn", "partial"),
+        ("aut", "Warm Autumn", "partial"),
+        ("deep autumn palette", "Deep Autumn", "partial"),
+    ])
+    def test_match(self, query, season, match_type):
+        """Test exact, case-insensitive and substring matches, first season in palette order."""
+        match = _resolve_season(query)
+        assert (match.season, match.match_type) == (season, match_type)
+
+    @pytest.mark.parametrize("query", ["summer soft", "autumn deep", "xyz"])
+    def test_no_match(self, query):
+        """Test that reordered words and unknown names are not matched."""
+        match = _resolve_season(query)
+        assert (match.season, match.match_type) == (None, "none")
@@ -0,0 +1,49 @@
+"""
+Tests for the color season result cache in the stylist service (LLM calls stubbed).
+"""
+import pytest
+
+from src.models import AnalyzeColorSeasonResponseModel
+from src.services import stylist
+from src.utils.image_utils import PreparedImage
+
+
+def _prepared(data: bytes = b"jpeg") -> PreparedImage:
+    return PreparedImage(data=data, base64="", mime_type="image/jpeg")
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """Stub the ensemble analyzer with an empty result cache, recording each analysis."""
+    calls = []
+
+    async def analyze_parallel(image, aggregation_method):
+        calls.append(("parallel", aggregation_method, image))
+        return AnalyzeColorSeasonResponseModel(personal_color_type="Deep Autumn", confidence=0.9)
+
+    monkeypatch.setattr(stylist.ensemble_analyzer, "analyze_parallel", analyze_parallel)
+    monkeypatch.setattr(stylist, "_color_season_cache", stylist.TTLCache(maxsize=16, ttl=60))
+    return calls
+
+
+class TestColorSeasonCache:
+    """Tests for caching color season results by analysis and image content."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_is_served_from_cache(self, analyses):
+        """Test that the same analysis of the same image runs once and returns independent copies."""
+        first = await stylist.get_your_color_season_ensemble_parallel(_prepared(), "voting")
+        first.confidence = 0.1
+        second = await stylist.get_your_color_season_ensemble_parallel(_prepared(), "voting")
+
+        assert len(analyses) == 1
+        assert second.confidence == 0.9
+
+    @pytest.mark.asyncio
+    async def test_key_includes_analysis_and_image(self, analyses):
+        """Test that other parameters or other image bytes miss the cache."""
+        await stylist.get_your_color_season_ensemble_parallel(_prepared(), "voting")
+        await stylist.get_your_color_season_ensemble_parallel(_prepared(), "consensus")
+        await stylist.get_your_color_season_ensemble_parallel(_prepared(b"other"), "voting")
+
+        assert [method for _, method, _ in analyses] == ["voting", "consensus", "voting"]
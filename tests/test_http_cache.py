@@ -0,0 +1,60 @@
+"""
+Unit tests for HTTP caching helpers.
+"""
+from unittest.mock import Mock
+
+from src.utils.http_cache import cached_json_response, cached_response, etag_matches, make_etag
+
+
+def _request(if_none_match=None):
+    request = Mock()
+    request.headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return request
+
+
+class TestEtagMatches:
+    """Tests for etag_matches function."""
+    
+    def test_no_header(self):
+        """Test that a missing header never matches."""
+        assert etag_matches(None, make_etag(b"body")) is False
+    
+    def test_exact_and_list(self):
+        """Test matching a single tag and a comma-separated list."""
+        etag = make_etag(b"body")
+        assert etag_matches(etag, etag) is True
+        assert etag_matches(f'"other", {etag}', etag) is True
+        assert etag_matches('"other"', etag) is False
+    
+    def test_weak_comparison_and_wildcard(self):
+        """Test that W/ prefixes are ignored and * matches anything."""
+        etag = make_etag(b"body")
+        assert etag_matches(etag.removeprefix("W/"), etag) is True
+        assert etag_matches("*", etag) is True
+
+
+class TestCachedResponse:
+    """Tests for cached_response and cached_json_response."""
+    
+    def test_returns_body_with_headers(self):
+        """Test that a fresh request gets the body and cache headers."""
+        response = cached_response(_request(), b'{"a":1}')
+        assert response.status_code == 200
+        assert response.body == b'{"a":1}'
+        assert response.headers["etag"] == make_etag(b'{"a":1}')
+        assert response.headers["cache-control"] == "public, max-age=60"
+    
+    def test_returns_304_when_etag_matches(self):
+        """Test that a matching If-None-Match yields an empty 304."""
+        etag = make_etag(b'{"a":1}')
+        response = cached_response(_request(etag), b'{"a":1}')
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+    
+    def test_json_content(self):
+        """Test that content is serialized as JSON."""
+        response = cached_json_response(_request(), [{"ID": 1}], max_age=30)
+        assert response.body == b'[{"ID":1}]'
+        assert response.media_type == "application/json"
+        assert response.headers["cache-control"] == "public, max-age=30"
@@ -6,7 +6,10 @@ import base64
 from PIL import Image
 from io import BytesIO
 
-from src.utils.image_utils import base64_to_image
+from src.utils.image_utils import (
+    base64_to_image, bytes_to_image, decode_data_url, encode_base64, encode_base64_bytes, prepare_image,
+    prepare_image_for_llm
+)
 
 
 class TestBase64ToImage:
@@ -48,3 +51,90 @@ class TestBase64ToImage:
         with pytest.raises(Exception):  # Should raise some error
             base64_to_image("invalid_base64_string!!!")
 
+
+class TestDecodeDataUrl:
+    """Tests for decode_data_url function."""
+    
+    def test_decode_plain_base64(self):
+        """Test decoding a base64 string without prefix."""
+        payload = b"\x89PNG\r\n\x1a\n some bytes"
+        assert decode_data_url(base64.b64encode(payload).decode("ascii")) == payload
+    
+    def test_decode_data_url(self):
+        """Test that the data URL prefix is stripped before decoding."""
+        payload = b"image bytes"
+        encoded = base64.b64encode(payload).decode("ascii")
+        assert decode_data_url(f"data:image/jpeg;base64,{encoded}") == payload
+    
+    def test_decode_invalid(self):
+        """Test that invalid base64 raises binascii.Error."""
+        import binascii
+        with pytest.raises(binascii.Error):
+            decode_data_url("abc")
+    
+    def test_decode_malformed_data_url(self):
+        """Test that a data URL without a comma is rejected instead of decoding its header."""
+        encoded = base64.b64encode(b"image bytes").decode("ascii")
+        with pytest.raises(ValueError, match="Malformed data URL"):
+            decode_data_url(f"data:image/jpeg;base64{encoded}")
+
+
+class TestBytesToImage:
+    """Tests for bytes_to_image function."""
+    
+    @pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+    def test_decode_formats(self, image_format):
+        """Test that JPEG (turbojpeg or Pillow) and PNG decode to RGB images."""
+        buffer = BytesIO()
+        Image.new('RGB', (64, 48), color='red').save(buffer, format=image_format)
+        
+        result_image = bytes_to_image(buffer.getvalue())
+        
+        assert result_image.size == (64, 48)
+        assert result_image.convert('RGB').getpixel((10, 10))[0] > 200
+
+
+class TestPrepareImageForLlm:
+    """Tests for prepare_image_for_llm function."""
+    
+    def test_downscales_large_image(self):
+        """Test that large images are downscaled to the long-side limit as JPEG."""
+        image = Image.new('RGBA', (3000, 1500), color='red')
+        
+        data = prepare_image_for_llm(image, max_dimension=1024)
+        encoded = Image.open(BytesIO(data))
+        
+        assert encoded.format == 'JPEG'
+        assert encoded.size == (1024, 512)
+        # The caller's image is not modified
+        assert image.size == (3000, 1500)
+    
+    def test_keeps_small_image_size(self):
+        """Test that images within the limit keep their size."""
+        data = prepare_image_for_llm(Image.new('RGB', (640, 480)), max_dimension=1024)
+        
+        assert Image.open(BytesIO(data)).size == (640, 480)
+
+
+class TestPrepareImage:
+    """Tests for prepare_image function."""
+    
+    def test_base64_matches_bytes(self):
+        """Test that the prepared image carries matching raw and base64 payloads."""
+        prepared = prepare_image(Image.new('RGB', (200, 200)))
+        
+        assert prepared.mime_type == 'image/jpeg'
+        assert base64.b64decode(prepared.base64) == prepared.data
+
+
+class TestEncodeBase64:
+    """Tests for encode_base64 function."""
+    
+    def test_matches_stdlib(self):
+        """Test that bytes and memoryviews encode like base64.b64encode (str and bytes variants)."""
+        payload = bytes(range(256)) * 3
+        expected = base64.b64encode(payload).decode("ascii")
+        
+        assert encode_base64(payload) == expected
+        assert encode_base64(memoryview(payload)) == expected
+        assert encode_base64_bytes(memoryview(payload)) == expected.encode("ascii")
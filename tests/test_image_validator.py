@@ -12,7 +12,11 @@ from src.utils.image_validator import (
     validate_file_size,
     validate_image,
     validate_image_from_bytes,
+    validate_and_prepare,
     validate_image_from_base64,
+    decode_and_validate,
+    get_image_pool,
+    shutdown_image_pool,
     ImageValidationError,
     DEFAULT_MAX_DIMENSION,
     DEFAULT_MIN_DIMENSION,
@@ -147,6 +151,60 @@ class TestComprehensiveValidation:
         assert result["width"] == 800
         assert result["height"] == 600
     
+    def test_validate_and_prepare(self):
+        """Test the pool entry point that returns a downscaled JPEG instead of pixels."""
+        image = Image.new('RGB', (2000, 1000))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        
+        prepared, result = validate_and_prepare(buffer.getvalue(), prepared_dimension=500)
+        
+        assert prepared.mime_type == "image/jpeg"
+        assert Image.open(BytesIO(prepared.data)).size == (500, 250)
+        assert result["width"] == 2000
+    
+    def test_decode_and_validate(self):
+        """Test the pool entry point accepts both bytes and base64 strings."""
+        image = Image.new('RGB', (800, 600))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        png_bytes = buffer.getvalue()
+        
+        _, from_bytes = decode_and_validate(png_bytes)
+        _, from_base64 = decode_and_validate(base64.b64encode(png_bytes).decode())
+        
+        assert from_bytes == from_base64
+        assert from_bytes["format"] == "PNG"
+
+    def test_decode_and_validate_fit_within(self):
+        """Test the validated image is downscaled, but validated at full size."""
+        image = Image.new('RGB', (800, 600))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+
+        pil_image, result = decode_and_validate(buffer.getvalue(), fit_within=400)
+
+        assert pil_image.size == (400, 300)
+        assert result["width"] == 800
+
+    def test_decode_and_validate_in_pool(self):
+        """Test images and validation errors survive the trip through the process pool."""
+        image = Image.new('RGB', (800, 600), color=(10, 20, 30))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        
+        try:
+            pool = get_image_pool()
+            pil_image, result = pool.submit(decode_and_validate, buffer.getvalue()).result()
+            assert pil_image.size == (800, 600)
+            assert pil_image.getpixel((0, 0)) == (10, 20, 30)
+            assert result["width"] == 800
+            
+            with pytest.raises(ImageValidationError):
+                pool.submit(decode_and_validate, b"not an image").result()
+        finally:
+            shutdown_image_pool()
+    
     def test_validate_image_from_base64(self):
         """Test validation from base64 string."""
         image = Image.new('RGB', (800, 600))
@@ -0,0 +1,31 @@
+"""
+Unit tests for LLM JSON parsing helpers.
+"""
+import json
+
+import pytest
+
+from src.utils.llm_json import parse_llm_json
+
+
+class TestParseLlmJson:
+    """Tests for parse_llm_json."""
+    
+    def test_plain_json(self):
+        """Test parsing unfenced JSON from str and bytes."""
+        assert parse_llm_json('{"season": "Spring"}') == {"season": "Spring"}
+        assert parse_llm_json(b' {"season": "Spring"}\n') == {"season": "Spring"}
+    
+    def test_strips_fences(self):
+        """Test that ```json and bare ``` fences are removed."""
+        assert parse_llm_json('```json\n{"a": 1}\n```') == {"a": 1}
+        assert parse_llm_json('```\n{"a": 1}```') == {"a": 1}
+    
+    def test_keeps_backticks_inside_values(self):
+        """Test that backticks inside the JSON body are preserved."""
+        assert parse_llm_json('{"tip": "use ```"}') == {"tip": "use ```"}
+    
+    def test_invalid_json_raises_json_decode_error(self):
+        """Test that errors are catchable as json.JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            parse_llm_json("not json")
@@ -0,0 +1,48 @@
+"""
+Unit tests for logging configuration.
+"""
+import json
+import logging
+import sys
+
+from src.utils.logger import JSONFormatter
+
+
+class TestJSONFormatter:
+    """Tests for JSONFormatter."""
+    
+    def _record(self, msg, *args, exc_info=None):
+        return logging.LogRecord(
+            "hackseoul.test", logging.INFO, __file__, 1, msg, args, exc_info
+        )
+    
+    def test_formats_single_line_json(self):
+        """Test that records are rendered as one JSON object."""
+        output = JSONFormatter().format(self._record("Request: %s %s", "GET", "/api"))
+        
+        assert "\n" not in output
+        payload = json.loads(output)
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "hackseoul.test"
+        assert payload["message"] == "Request: GET /api"
+        assert "timestamp" in payload
+    
+    def test_includes_exception(self):
+        """Test that exception tracebacks are included."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self._record("failed", exc_info=sys.exc_info())
+        
+        payload = json.loads(JSONFormatter().format(record))
+        assert "ValueError: boom" in payload["exc_info"]
+    
+    def test_includes_extra_fields(self):
+        """Test that fields passed via extra are emitted as top-level keys."""
+        record = self._record("Login successful: user_id=%s", 7)
+        record.user_id = 7
+        
+        payload = json.loads(JSONFormatter().format(record))
+        assert payload["user_id"] == 7
+        assert "args" not in payload
+        assert "msg" not in payload
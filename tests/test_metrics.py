@@ -0,0 +1,53 @@
+"""
+Unit tests for metrics middleware.
+"""
+from src.middleware.metrics import MetricsCollector
+
+
+class TestMetricsCollector:
+    """Tests for MetricsCollector."""
+    
+    def test_records_counts_and_success_rate(self):
+        """Test that success and error counts are tracked per endpoint."""
+        collector = MetricsCollector()
+        collector.record_request("/api/test", 0.1, 200)
+        collector.record_request("/api/test", 0.2, 201)
+        collector.record_request("/api/test", 0.3, 500)
+        
+        metrics = collector.get_metrics("/api/test")
+        assert metrics["request_count"] == 3
+        assert metrics["success_count"] == 2
+        assert metrics["error_count"] == 1
+        assert abs(metrics["success_rate"] - 2 / 3) < 1e-9
+        assert metrics["min_response_time"] == 0.1
+        assert metrics["max_response_time"] == 0.3
+    
+    def test_samples_are_bounded(self):
+        """Test that only the most recent samples are kept."""
+        collector = MetricsCollector(max_samples=10)
+        for i in range(25):
+            collector.record_request("/api/test", float(i), 200)
+        
+        metrics = collector.get_metrics("/api/test")
+        assert metrics["request_count"] == 25
+        assert metrics["min_response_time"] == 15.0
+        assert metrics["max_response_time"] == 24.0
+    
+    def test_unknown_endpoint(self):
+        """Test metrics for an endpoint with no requests."""
+        metrics = MetricsCollector().get_metrics("/missing")
+        assert metrics["request_count"] == 0
+        assert metrics["p99_response_time"] == 0.0
+    
+    def test_all_metrics_and_reset(self):
+        """Test summary across endpoints and reset."""
+        collector = MetricsCollector()
+        collector.record_request("/a", 0.1, 200)
+        collector.record_request("/b", 0.1, 404)
+        
+        summary = collector.get_metrics()["summary"]
+        assert summary["total_requests"] == 2
+        assert summary["total_errors"] == 1
+        
+        collector.reset()
+        assert collector.get_metrics()["summary"]["total_requests"] == 0
@@ -5,7 +5,7 @@ import pytest
 import time
 from unittest.mock import Mock, AsyncMock
 
-from src.middleware.rate_limit import SimpleRateLimiter, get_remote_address
+from src.middleware.rate_limit import SimpleRateLimiter, RedisRateLimiter, get_remote_address
 
 
 class TestSimpleRateLimiter:
@@ -117,6 +117,39 @@ class TestSimpleRateLimiter:
         assert is_allowed is True
 
 
+class TestRedisRateLimiter:
+    """Tests for RedisRateLimiter."""
+    
+    @pytest.mark.asyncio
+    async def test_uses_script_result(self):
+        """Test that the Lua script result decides the outcome."""
+        limiter = RedisRateLimiter("redis://localhost:6379/0")
+        limiter._script = AsyncMock(return_value=[0, 42])
+        
+        is_allowed, retry_after = await limiter.check("127.0.0.1", "/api/analyze/color", "10/minute")
+        assert is_allowed is False
+        assert retry_after == 42
+        
+        keys = limiter._script.call_args.kwargs["keys"]
+        args = limiter._script.call_args.kwargs["args"]
+        assert keys == ["ratelimit:127.0.0.1:/api/analyze/color"]
+        assert args[1:3] == [60, 10]
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_when_redis_fails(self):
+        """Test that Redis errors fall back to the in-memory limiter."""
+        limiter = RedisRateLimiter("redis://localhost:6379/0")
+        limiter._script = AsyncMock(side_effect=ConnectionError("down"))
+        
+        for i in range(5):
+            is_allowed, _ = await limiter.check("127.0.0.1", "/api/try-on/generate", "5/minute")
+            assert is_allowed is True
+        
+        is_allowed, retry_after = await limiter.check("127.0.0.1", "/api/try-on/generate", "5/minute")
+        assert is_allowed is False
+        assert retry_after > 0
+
+
 class TestGetRemoteAddress:
     """Tests for get_remote_address function."""
     
@@ -0,0 +1,38 @@
+"""
+Unit tests for response classes and handlers.
+"""
+import asyncio
+
+import orjson
+from fastapi import HTTPException
+
+from src.utils.responses import ORJSONResponse, http_exception_handler
+
+
+class TestORJSONResponse:
+    """Tests for ORJSONResponse."""
+    
+    def test_render_non_str_keys(self):
+        """Test that int dict keys (e.g. status codes in metrics) are serialized."""
+        response = ORJSONResponse({200: 3, "ok": True})
+        assert orjson.loads(response.body) == {"200": 3, "ok": True}
+
+
+class TestHttpExceptionHandler:
+    """Tests for http_exception_handler."""
+    
+    def test_detail_and_headers(self):
+        """Test status, {"detail": ...} body and headers match FastAPI's default handler."""
+        exc = HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        response = asyncio.run(http_exception_handler(None, exc))
+        
+        assert response.status_code == 401
+        assert orjson.loads(response.body) == {"detail": "Not authenticated"}
+        assert response.headers["www-authenticate"] == "Bearer"
+    
+    def test_no_body_for_304(self):
+        """Test statuses that forbid a body get an empty response."""
+        response = asyncio.run(http_exception_handler(None, HTTPException(status_code=304)))
+        
+        assert response.status_code == 304
+        assert response.body == b""
@@ -0,0 +1,169 @@
+"""
+Tests for the try-on API endpoints (services stubbed, no Gemini calls).
+"""
+import base64
+from io import BytesIO
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from src.api import try_on
+
+
+def _png(color: str = "blue", size: tuple = (200, 200)) -> bytes:
+    buffer = BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _data_url(color: str = "blue") -> str:
+    return "data:image/png;base64," + base64.b64encode(_png(color)).decode()
+
+
+@pytest.fixture
+def validations(monkeypatch):
+    """Run image validation inline instead of in the process pool, recording each call."""
+    calls = []
+
+    async def run_inline(func, *args):
+        calls.append(args)
+        return func(*args)
+
+    monkeypatch.setattr(try_on, "run_in_image_pool", run_inline)
+    monkeypatch.setattr(try_on, "_validated_inputs", try_on.TTLCache(maxsize=16, ttl=60))
+    return calls
+
+
+@pytest.fixture
+def full_outfit_calls(monkeypatch):
+    """Stub the full-outfit service with an empty result cache, recording each call."""
+    calls = []
+
+    def fake_service(user_image, upper_image, lower_image, shoes_image):
+        calls.append((user_image, upper_image, lower_image, shoes_image))
+        return upper_image, _png("white")
+
+    monkeypatch.setattr(try_on, "service_get_outfit_on_full_outfit", fake_service)
+    monkeypatch.setattr(try_on, "_full_outfit_results", try_on.TTLCache(maxsize=8, ttl=60))
+    return calls
+
+
+def _full_outfit_body(upper_color: str = "red") -> dict:
+    return {
+        "user_image": _data_url(),
+        "upper_image": _data_url(upper_color),
+        "lower_image": _data_url("green"),
+        "shoes_image": _data_url("black"),
+    }
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(try_on.router)
+    return TestClient(app)
+
+
+class TestValidatedInputs:
+    """Tests for reuse of validation results across try-on requests."""
+
+    def test_repeated_image_skips_validation(self, client, monkeypatch, validations):
+        """Test that a re-posted user image is validated once but decoded per request."""
+        received = []
+
+        async def fake_service(user_image, product_image):
+            received.append(user_image)
+            return product_image, None
+
+        monkeypatch.setattr(try_on, "service_aget_outfit_on", fake_service)
+
+        for color in ("red", "green"):
+            response = client.post(
+                "/api/try-on/generate",
+                json={"user_image": _data_url(), "product_image": _data_url(color)}
+            )
+            assert response.status_code == 200
+
+        # User image once, each product image once (user and product validate concurrently)
+        assert sorted(require_face for _, require_face, *_ in validations) == [False, False, True]
+        assert received[0] is not received[1]
+        assert received[0].tobytes() == received[1].tobytes()
+
+
+class TestContentNegotiation:
+    """Tests for PNG-or-JSON responses on the base64 try-on endpoints."""
+
+    @pytest.mark.parametrize("accept, media_type", [
+        ("image/png", "image/png"),
+        ("*/*", "application/json"),
+        (None, "application/json"),
+        ("application/json;q=0.9, image/png", "image/png"),
+        ("image/png;q=0.5, application/json", "application/json"),
+        ("image/png;q=high, application/json", "application/json"),
+    ])
+    def test_accept(self, client, validations, full_outfit_calls, accept, media_type):
+        """Test that the Accept header picks raw PNG or the JSON data URL body."""
+        if accept is None:
+            del client.headers["accept"]
+        else:
+            client.headers["accept"] = accept
+
+        response = client.post("/api/try-on/generate-full-outfit", json=_full_outfit_body())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == media_type
+        assert "Accept" in response.headers["vary"]
+        if media_type == "image/png":
+            assert response.content == _png("white")
+        else:
+            data_url = response.json()["try_on_full_outfit_image"]
+            assert base64.b64decode(data_url.split(",", 1)[1]) == _png("white")
+
+    def test_prefers_png(self):
+        """Test q-value parsing of the Accept header."""
+        assert try_on._prefers_png("image/png")
+        assert try_on._prefers_png("image/png;q=0.8, application/json;q=0.5")
+        assert not try_on._prefers_png(None)
+        assert not try_on._prefers_png("image/png, application/json")
+        assert not try_on._prefers_png("image/png;q=oops")
+
+
+class TestFullOutfitCache:
+    """Tests for the full-outfit result cache."""
+
+    def test_hit_skips_validation_and_generation(self, client, validations, full_outfit_calls):
+        """Test that re-posting the same four images reuses the generated PNG."""
+        first = client.post("/api/try-on/generate-full-outfit", json=_full_outfit_body())
+        second = client.post("/api/try-on/generate-full-outfit", json=_full_outfit_body())
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert len(full_outfit_calls) == 1
+        assert len(validations) == 4
+
+    def test_different_inputs_do_not_collide(self, client, validations, full_outfit_calls):
+        """Test that a changed or swapped input image misses the cache."""
+        body = _full_outfit_body()
+        client.post("/api/try-on/generate-full-outfit", json=body)
+        client.post("/api/try-on/generate-full-outfit", json=_full_outfit_body("yellow"))
+        swapped = dict(body, upper_image=body["lower_image"], lower_image=body["upper_image"])
+        client.post("/api/try-on/generate-full-outfit", json=swapped)
+
+        assert len(full_outfit_calls) == 3
+
+    def test_upload_endpoint_caches_by_content(self, client, validations, full_outfit_calls):
+        """Test that the multipart endpoint caches by the uploaded bytes."""
+        files = {
+            name: (f"{name}.png", _png(color), "image/png")
+            for name, color in [
+                ("user_image", "blue"), ("upper_image", "red"), ("lower_image", "green"), ("shoes_image", "black")
+            ]
+        }
+        for _ in range(2):
+            response = client.post("/api/test/try-on/full_outfit", files=files)
+            assert response.status_code == 200
+            assert response.content == _png("white")
+
+        assert len(full_outfit_calls) == 1
@@ -0,0 +1,105 @@
+"""
+Tests for the user color results API endpoints (in-memory SQLite).
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api import user_color
+from src.database.user_db import Base, UserColorResult, get_db
+from src.utils.auth import CurrentUser, get_current_user
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(user_color.router)
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=1, email="user@example.com", created_at=None)
+    return TestClient(app)
+
+
+def _add_results(session_factory, created_ats):
+    """Insert results for user 1 in order, returning their ids."""
+    with session_factory() as db:
+        results = [
+            UserColorResult(user_id=1, personal_color_type="Spring Warm", confidence=0.9, created_at=created_at)
+            for created_at in created_ats
+        ]
+        db.add_all(results)
+        db.commit()
+        return [result.id for result in results]
+
+
+class TestColorResultsPaging:
+    """Tests for keyset paging of GET /api/user/color/results."""
+
+    def test_cursor_pages_through_ties(self, client, session_factory):
+        """Test that results sharing the boundary timestamp are not skipped."""
+        same = datetime(2026, 1, 2)
+        ids = _add_results(session_factory, [datetime(2026, 1, 1), same, same, same])
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            page = client.get("/api/user/color/results", params=params).json()
+            if not page:
+                break
+            seen.extend(result["id"] for result in page)
+            params = {"limit": 2, "cursor": page[-1]["created_at"], "cursor_id": page[-1]["id"]}
+
+        assert seen == [ids[3], ids[2], ids[1], ids[0]]
+
+    def test_pages_are_index_range_scans(self, session_factory):
+        """Test that both first and later pages read the composite index in order, without a sort."""
+        with session_factory() as db:
+            for cursor in (None, datetime(2026, 1, 1)):
+                query = db.query(*user_color._RESULT_COLUMNS).filter(UserColorResult.user_id == 1)
+                if cursor is not None:
+                    query = query.filter(user_color._older_than(cursor, 5))
+                statement = query.order_by(*user_color._NEWEST_FIRST).limit(10).statement
+                sql = str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+                plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+                assert "NULLS" not in sql
+                assert "USING INDEX ix_user_color_results_user_created_id" in plan
+                assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.parametrize("params", [
+        {"cursor": "2026-01-01T00:00:00"},
+        {"cursor_id": 1},
+    ])
+    def test_cursor_and_cursor_id_go_together(self, client, params):
+        """Test that half a cursor is rejected."""
+        response = client.get("/api/user/color/results", params=params)
+        assert response.status_code == 422
+
+    def test_default_limit(self, client, session_factory, monkeypatch):
+        """Test that DEFAULT_RESULTS_LIMIT caps results when no limit is given."""
+        monkeypatch.setattr(user_color, "DEFAULT_RESULTS_LIMIT", 3)
+        _add_results(session_factory, [datetime(2026, 1, day) for day in range(1, 6)])
+
+        assert len(client.get("/api/user/color/results").json()) == 3
+        assert len(client.get("/api/user/color/results", params={"limit": 5}).json()) == 5